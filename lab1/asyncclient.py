@@ -0,0 +1,144 @@
+"""
+asyncio client for the phonebook service with a bounded connection pool
+"""
+
+import asyncio
+import logging
+
+import compression
+import const_cs
+from clientserver import frame
+
+
+class ServiceError(Exception):
+    """ The server answered with an ERR response """
+
+
+class Connection:
+    """ A single connection speaking the length-prefixed phonebook protocol """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.codec: str | None = None  # negotiated response compression
+
+    @classmethod
+    async def open(cls, host: str, port: int, timeout: float, compress: bool = False) -> 'Connection':
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        conn = cls(reader, writer)
+        if compress:
+            answer = await conn.request('COMPRESS\n' + ','.join(compression.CODECS))
+            if answer[0] == 'COMPRESSION' and answer[1] != 'none':
+                conn.codec = answer[1]
+        return conn
+
+    def healthy(self) -> bool:
+        """ False once the server closed the connection or writing failed """
+        return not (self.writer.is_closing() or self.reader.at_eof())
+
+    async def request(self, msg: str) -> list[str]:
+        self.writer.write(frame(msg))
+        await self.writer.drain()
+        length, compressed = compression.split_prefix(await self.reader.readexactly(4))
+        data = await self.reader.readexactly(length)
+        if compressed:
+            data = compression.decompress(data, self.codec)
+        return data.decode('utf-8').splitlines()
+
+    def close(self):
+        self.writer.close()
+
+
+class ConnectionPool:
+    """
+    Bounded pool of connections.
+    At most <size> connections exist; callers wait for a free one.
+    Broken connections are dropped and replaced by new ones on demand.
+    """
+    _logger = logging.getLogger("vs2lab.lab1.asyncclient.ConnectionPool")
+
+    def __init__(self, host: str, port: int, size: int, connect_timeout: float, compress: bool = False):
+        self.host = host
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self.compress = compress
+        self._slots = asyncio.Semaphore(size)
+        self._idle: list[Connection] = []
+
+    async def acquire(self) -> Connection:
+        await self._slots.acquire()
+        try:
+            while self._idle:
+                conn = self._idle.pop()
+                if conn.healthy():
+                    return conn
+                self._logger.info("Dropping closed connection")
+                conn.close()
+            return await Connection.open(self.host, self.port, self.connect_timeout, self.compress)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def release(self, conn: Connection, reuse: bool = True):
+        if reuse and conn.healthy():
+            self._idle.append(conn)
+        else:
+            conn.close()
+        self._slots.release()
+
+    def close(self):
+        for conn in self._idle:
+            conn.close()
+        self._idle.clear()
+
+
+class AsyncClient:
+    """ The asynchronous client """
+
+    def __init__(self, host: str = const_cs.HOST, port: int = const_cs.PORT,
+                 pool_size: int = 4, connect_timeout: float = 3, retries: int = 1, compress: bool = False):
+        self.pool = ConnectionPool(host, port, pool_size, connect_timeout, compress)
+        self.retries = retries
+
+    async def __aenter__(self) -> 'AsyncClient':
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _call(self, msg: str) -> list[str]:
+        """ Send a request on a pooled connection, reconnecting on failure """
+        for attempt in range(self.retries + 1):
+            conn = await self.pool.acquire()
+            reuse = False  # a request interrupted halfway (error, cancellation) leaves the stream unusable
+            try:
+                response = await conn.request(msg)
+                reuse = True
+            except (OSError, asyncio.IncompleteReadError):
+                if attempt == self.retries:
+                    raise
+                continue
+            finally:
+                self.pool.release(conn, reuse=reuse)
+            if response and response[0] == 'ERR':
+                raise ServiceError(response[1] if len(response) > 1 else 'unknown error')
+            return response
+        raise AssertionError('unreachable')
+
+    async def get(self, name: str) -> str | None:
+        """ Number for name, None if the name is unknown """
+        response = await self._call('GET\n' + name)
+        return response[1] if response[0] == 'FOUND' else None
+
+    async def get_many(self, names: list[str]) -> dict[str, str | None]:
+        """ Look up several names concurrently over the pooled connections """
+        numbers = await asyncio.gather(*(self.get(name) for name in names))
+        return dict(zip(names, numbers))
+
+    async def getall(self) -> dict[str, str]:
+        response = await self._call('GETALL')
+        entries = response[1].split(';') if len(response) > 1 else []
+        return dict(entry.split(': ', 1) for entry in entries)
+
+    async def close(self):
+        self.pool.close()
@@ -0,0 +1,50 @@
+"""
+Build a memory-mapped phonebook store for the server (see telstore.py)
+
+Examples:
+    python build_telstore.py --entries 10000000            # generated entries
+    python build_telstore.py --input phonebook.tsv         # lines "<name>\\t<number>"
+"""
+
+import argparse
+import time
+from typing import Iterator
+
+import const_cs
+import tel
+from telstore import RUN_SIZE, TelStore
+
+
+def read_tsv(path: str) -> Iterator[tuple[str, str]]:
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            name, sep, number = line.rstrip('\n').partition('\t')
+            if sep:
+                yield name, number
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build a phonebook store')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--entries', type=int, default=len(tel.tel),
+                        help='number of generated entries (default: %(default)s)')
+    source.add_argument('--input', help='tab separated file with names and numbers')
+    parser.add_argument('--output', default=const_cs.STORE_FILE, help='store file (default: %(default)s)')
+    parser.add_argument('--run-size', type=int, default=RUN_SIZE,
+                        help='entries sorted in memory per run (default: %(default)s)')
+    args = parser.parse_args()
+
+    items = read_tsv(args.input) if args.input else tel.generate(args.entries)
+    start = time.perf_counter()
+    TelStore.build(args.output, items, run_size=args.run_size)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    store = TelStore(args.output)
+    open_time = time.perf_counter() - start
+    print(f"Wrote {len(store)} entries to {args.output} in {build_time:.1f}s (open: {open_time * 1000:.3f}ms)")
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -3,13 +3,19 @@ Client and server using classes
 """
 
 import logging
+import os
+import signal
 import socket
 import struct
+import threading
+from collections import OrderedDict
 
+import compression
 import const_cs
 from context import lab_logging
 
 from tel import tel
+from telstore import TelStore
 
 
 lab_logging.setup(stream_level=logging.INFO)  # init loging channels for the lab
@@ -29,21 +35,78 @@ def recv_all(connection: socket.socket, n: int) -> bytes | None:
     return data
 
 
+def frame(msg: str) -> bytes:
+    """Encode a message and prepend the 4-byte length prefix."""
+    msg_bytes = msg.encode('utf-8')
+    return struct.pack('!I', len(msg_bytes)) + msg_bytes
+
+
+class ResponseCache:
+    """
+    Bounded LRU cache of fully framed response bytes.
+
+    Every entry remembers the data version it was built from. A lookup with a
+    newer version counts as a miss, so changing the phonebook invalidates all
+    cached responses without walking the cache.
+    """
+
+    def __init__(self, capacity: int = const_cs.CACHE_SIZE):
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[int, bytes]] = OrderedDict()
+        self._lock = threading.Lock()  # connections are served by concurrent threads
+
+    def get(self, key: str, version: int) -> bytes | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)  # mark as most recently used
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: str, version: int, response: bytes):
+        with self._lock:
+            self._entries[key] = (version, response)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)  # evict least recently used
+
+    def stats(self) -> dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+
 class Server:
     """ The server """
     _logger = logging.getLogger("vs2lab.lab1.clientserver.Server")
     _serving = True
 
-    def __init__(self):
+    def __init__(self, phonebook=None, reuse_port: bool = False, max_connections: int = const_cs.MAX_CONNECTIONS):
+        self.phonebook = tel if phonebook is None else phonebook  # dict or TelStore
+        # bounds the connection threads, further clients wait in the listen backlog
+        self._connections = threading.BoundedSemaphore(max_connections)
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)  # prevents errors due to "addresses in use"
+        if reuse_port:  # several processes share the port, the kernel balances connections
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
         self.sock.bind((const_cs.HOST, const_cs.PORT))
         self.sock.settimeout(3)  # time out in order not to block forever
         self._logger.info("Server bound to socket %s", self.sock)
+        self.version = 0  # incremented on every phonebook change
+        self.cache = ResponseCache()
+
+    def set_tel(self, name: str, number: str):
+        """ Add or change an entry and invalidate cached responses """
+        if isinstance(self.phonebook, TelStore):
+            raise TypeError("the phonebook store is read-only, rebuild it with build_telstore.py to change entries")
+        self.phonebook[name] = number
+        self.version += 1
 
     def get_tel(self, name: str) -> str | None:
         self._logger.info('getting number for: %s', name)
-        return tel.get(name)
+        return self.phonebook.get(name)
 
     def format_get_result(self, number: str | None) -> str:
         self._logger.info('formatting result')
@@ -59,7 +122,7 @@ class Server:
         return command + msg
 
     def getall_tel(self) -> list[tuple[str, str]]:
-        return list(tel.items())
+        return list(self.phonebook.items())
 
     def format_getall_result(self, numbers: list[tuple[str, str]]) -> str:
         self._logger.info('formatting result')
@@ -70,72 +133,176 @@ class Server:
 
         return command + msg
 
+    def handle(self, data: str, codec: str | None = None) -> bytes:
+        """ Process a request and return the framed response, compressed with codec if worthwhile """
+        self._logger.info("Message received: %r", data)
+        data_lines = data.splitlines()
+        command = data_lines[0] if data_lines else ''
+        self._logger.info("Command: %s", command)
+        # Read the version once: a response is only stored under the version it was
+        # looked up with, so a concurrent set_tel can never make old data look fresh
+        version = self.version
+
+        # Answer GET and GETALL from the cache while the phonebook is unchanged
+        cacheable = command == 'GETALL' or (command == 'GET' and len(data_lines) >= 2)
+        cache_key = f"{codec}:{data}"  # compressed and plain responses are cached separately
+        if cacheable:
+            cached = self.cache.get(cache_key, version)
+            if cached is not None:
+                return cached
+
+        # Determine response message
+        formatted_msg: str
+        if command == 'GET':
+            if len(data_lines) < 2:
+                self._logger.warning("Malformed GET command received (missing parameter).")
+                formatted_msg = 'ERR\nMalformed GET command'
+            else:
+                query_param: str = data_lines[1]
+                tel_result = self.get_tel(query_param)
+                formatted_msg = self.format_get_result(tel_result)
+        elif command == 'GETALL':
+            tel_result = self.getall_tel()
+            formatted_msg = self.format_getall_result(tel_result)
+        else:
+            self._logger.warning("Command %s not supported", command)
+            formatted_msg = 'ERR\nCommand not supported'
+
+        # Encode message and prepend length prefix before sending
+        response = compression.compress_frame(frame(formatted_msg), codec, const_cs.COMPRESS_THRESHOLD)
+        if cacheable:
+            self.cache.put(cache_key, version, response)
+        return response
+
+    def negotiate(self, data: str) -> tuple[str | None, bytes]:
+        """ Choose a codec from a COMPRESS request, return it with the framed answer """
+        data_lines = data.splitlines()
+        offered = data_lines[1].split(',') if len(data_lines) > 1 else []
+        codec = compression.negotiate(offered)
+        self._logger.info("Compression offered: %s, chosen: %s", offered, codec)
+        return codec, frame('COMPRESSION\n' + (codec or 'none'))
+
+    def serve_connection(self, connection: socket.socket):
+        """ Answer requests on one connection until the client closes it """
+        codec: str | None = None  # negotiated compression of this connection
+        try:
+            while True:  # forever
+                len_prefix: bytes | None = recv_all(connection, 4)  # read length prefix first
+                if not len_prefix:
+                    self._logger.info("Connection closed by client.")
+                    break
+                self._logger.info("Received message length prefix, unpacking ...")
+                (msg_len,) = struct.unpack('!I', len_prefix)
+                self._logger.info(f"Message length is: {msg_len} bytes. Now receiving full message ...")
+                data_bytes = recv_all(connection, msg_len)
+                if not data_bytes:
+                    self._logger.error("Connection closed unexpectedly while receiving message body.")
+                    break
+                data = data_bytes.decode('utf-8')
+                if data.partition('\n')[0] == 'COMPRESS':
+                    codec, full_message_out = self.negotiate(data)
+                else:
+                    full_message_out = self.handle(data, codec)
+                self._logger.info("Sending message with length %d", len(full_message_out) - 4)
+                connection.sendall(full_message_out)
+        except OSError as e:
+            self._logger.warning("Connection failed: %s", e)
+        finally:
+            connection.close()  # close the connection
+
+    def _serve_and_release(self, connection: socket.socket):
+        try:
+            self.serve_connection(connection)
+        finally:
+            self._connections.release()
+
     def serve(self):
         """ Serve echo """
-        print(tel.items())
-        self.sock.listen(1)
+        self._logger.info("Serving %d phonebook entries", len(self.phonebook))
+        self.sock.listen(const_cs.BACKLOG)
 
         while self._serving:  # as long as _serving (checked after connections or socket timeouts)
+            if not self._connections.acquire(timeout=1):
+                continue  # all connection threads busy, check _serving again
             try:
                 (connection, _) = self.sock.accept()  # returns new socket and address of client
-                while True:  # forever
-                    len_prefix: bytes | None = recv_all(connection, 4)  # read length prefix first
-                    if not len_prefix:
-                        self._logger.info("Connection closed by client.")
-                        break
-                    self._logger.info("Received message length prefix, unpacking ...")
-                    (msg_len,) = struct.unpack('!I', len_prefix)
-                    self._logger.info(f"Message length is: {msg_len} bytes. Now receiving full message ...")
-                    data_bytes = recv_all(connection, msg_len)
-                    if not data_bytes:
-                        self._logger.error("Connection closed unexpectedly while receiving message body.")
-                        break
-                    data = data_bytes.decode('utf-8')
-                    self._logger.info("Message received: %r", data)
-                    data_lines = data.splitlines()
-                    command = data_lines[0]
-                    self._logger.info("Command: %s", command)
-
-                    # Determine response message
-                    formatted_msg: str
-                    if command == 'GET':
-                        if len(data_lines) < 2:
-                            self._logger.warning("Malformed GET command received (missing parameter).")
-                            formatted_msg = 'ERR\nMalformed GET command'
-                        else:
-                            query_param: str = data_lines[1]
-                            tel_result = self.get_tel(query_param)
-                            formatted_msg = self.format_get_result(tel_result)
-                    elif command == 'GETALL':
-                        tel_result = self.getall_tel()
-                        formatted_msg = self.format_getall_result(tel_result)
-                    else:
-                        self._logger.warning("Command %s not supported", command)
-                        formatted_msg = 'ERR\nCommand not supported'
-                    
-                    # Encode message and prepend length prefix before sending
-                    msg_bytes_out = formatted_msg.encode('utf-8')
-                    len_prefix_out = struct.pack('!I', len(msg_bytes_out))
-                    full_message_out = len_prefix_out + msg_bytes_out
-                    
-                    self._logger.info("Sending message with length %d", len(msg_bytes_out))
-                    connection.sendall(full_message_out)
-
-                connection.close()  # close the connection
             except socket.timeout:
-                pass  # ignore timeouts
+                self._connections.release()
+                continue  # ignore timeouts
+            # serve each connection in its own thread, so pooled clients can keep connections open
+            threading.Thread(target=self._serve_and_release, args=(connection,), daemon=True).start()
         self.sock.close()
+        self._logger.info("Response cache: %s", self.cache.stats())
         self._logger.info("Server down.")
 
 
+def serve_workers(workers: int, store: str | None = None):
+    """
+    Serve with several forked worker processes.
+    All workers bind the same port and map the same read-only phonebook store.
+    Without a given store a snapshot of the in-memory phonebook is written first.
+    """
+    logger = logging.getLogger("vs2lab.lab1.clientserver.serve_workers")
+    path = store
+    if path is None:
+        path = const_cs.SNAPSHOT_FILE
+        TelStore.build(path, tel.items())
+    pids: list[int] = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:  # worker process
+            try:
+                Server(phonebook=TelStore(path), reuse_port=True).serve()
+            finally:
+                os._exit(0)  # never return into the caller of the parent
+        pids.append(pid)
+    logger.info("Started %d workers: %s", workers, pids)
+
+    def interrupt(_signum, _frame):
+        raise KeyboardInterrupt
+    signal.signal(signal.SIGTERM, interrupt)  # also stop the workers when terminated
+    try:
+        for pid in pids:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        for pid in pids:
+            os.kill(pid, signal.SIGTERM)
+    logger.info("Workers down.")
+
+
 class Client:
     """ The client """
     logger = logging.getLogger("vs2lab.a1_layers.clientserver.Client")
 
-    def __init__(self):
+    def __init__(self, compress: bool = False):
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         self.sock.connect((const_cs.HOST, const_cs.PORT))
         self.logger.info("Client connected to socket %s", self.sock)
+        self.codec: str | None = None
+        if compress:  # offer all available codecs, the server picks one
+            self.sock.sendall(frame('COMPRESS\n' + ','.join(compression.CODECS)))
+            answer = (self._recv_frame() or b'').decode('utf-8').splitlines()
+            if len(answer) > 1 and answer[0] == 'COMPRESSION' and answer[1] != 'none':
+                self.codec = answer[1]
+            self.logger.info("Negotiated compression: %s", self.codec)
+
+    def _recv_frame(self) -> bytes | None:
+        """ Receive one response body, decompressing it if flagged """
+        len_prefix_in = recv_all(self.sock, 4)
+        if not len_prefix_in:
+            print("Server closed connection unexpectedly.")
+            return None
+
+        msg_len_in, compressed = compression.split_prefix(len_prefix_in)
+        self.logger.info("Expecting %d bytes from server.", msg_len_in)
+
+        data_bytes = recv_all(self.sock, msg_len_in)
+        if not data_bytes:
+            print("Server closed connection while sending message body.")
+            return None
+        if compressed:
+            data_bytes = compression.decompress(data_bytes, self.codec)
+        return data_bytes
 
     def call(self, msg_in: str = "GETALL"):
         """ Call server """
@@ -151,17 +318,8 @@ class Client:
         self.sock.sendall(full_message)  # sendall repeatedly tries to send until all data is sent
 
         # Receive response: first get length prefix, then the message body
-        len_prefix_in = recv_all(self.sock, 4)
-        if not len_prefix_in:
-            print("Server closed connection unexpectedly.")
-            return "ERR"
-        
-        (msg_len_in,) = struct.unpack('!I', len_prefix_in)
-        self.logger.info("Expecting %d bytes from server.", msg_len_in)
-
-        data_bytes = recv_all(self.sock, msg_len_in)
+        data_bytes = self._recv_frame()
         if not data_bytes:
-            print("Server closed connection while sending message body.")
             return "ERR"
 
         self.logger.info("Message received: %r", data_bytes.decode('utf-8'))
@@ -0,0 +1,65 @@
+"""
+Response compression for the phonebook protocol
+
+A client offers codecs with the request "COMPRESS\\n<codec>,<codec>,...".
+The server answers "COMPRESSION\\n<codec>" (or "none") and from then on may
+send compressed frames on that connection. A compressed frame has the
+highest bit of its 4-byte length prefix set; other frames are unchanged.
+"""
+
+import struct
+import zlib
+from typing import Callable
+
+COMPRESSED = 0x80000000  # length prefix flag of compressed frames
+LENGTH_MASK = COMPRESSED - 1
+
+Codec = tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]
+
+# available codecs, in order of preference
+CODECS: dict[str, Codec] = {}
+
+try:
+    import zstandard
+    CODECS['zstd'] = (zstandard.ZstdCompressor().compress, zstandard.ZstdDecompressor().decompress)
+except ImportError:
+    pass
+
+try:
+    import lz4.frame
+    CODECS['lz4'] = (lz4.frame.compress, lz4.frame.decompress)
+except ImportError:
+    pass
+
+CODECS['zlib'] = (zlib.compress, zlib.decompress)
+
+
+def negotiate(offered: list[str]) -> str | None:
+    """ Pick the preferred codec among those offered by a client """
+    for name in CODECS:
+        if name in offered:
+            return name
+    return None
+
+
+def compress_frame(response: bytes, codec: str | None, threshold: int) -> bytes:
+    """ Compress a plain frame if a codec is set, the body is large and compression pays off """
+    body = response[4:]
+    if codec is None or len(body) <= threshold:
+        return response
+    compressed = CODECS[codec][0](body)
+    if len(compressed) >= len(body):
+        return response
+    return struct.pack('!I', len(compressed) | COMPRESSED) + compressed
+
+
+def split_prefix(len_prefix: bytes) -> tuple[int, bool]:
+    """ Body length and compression flag of a length prefix """
+    (value,) = struct.unpack('!I', len_prefix)
+    return value & LENGTH_MASK, bool(value & COMPRESSED)
+
+
+def decompress(body: bytes, codec: str | None) -> bytes:
+    if codec is None:
+        raise ValueError('compressed frame on a connection without compression')
+    return CODECS[codec][1](body)
@@ -4,3 +4,9 @@ Constant definitions
 
 HOST = '127.0.0.1'
 PORT = 50007
+CACHE_SIZE = 256  # max. number of cached responses
+SNAPSHOT_FILE = 'tel.db'  # phonebook snapshot shared by worker processes
+STORE_FILE = 'tel.store'  # persistent phonebook store, see build_telstore.py
+BACKLOG = 128  # pending connections queued by the server socket
+MAX_CONNECTIONS = 64  # connections served concurrently, each by its own thread
+COMPRESS_THRESHOLD = 1024  # min. response size in bytes for compression
@@ -0,0 +1,231 @@
+"""
+Load generator for the phonebook service
+
+Drives N concurrent connections with a configurable mix of GET and GETALL
+requests and reports throughput and latency percentiles as JSON.
+
+Examples:
+    python loadgen.py --connections 8 --duration 10
+    python loadgen.py --keys zipf --pipeline 16 --getall-ratio 0.01
+    python loadgen.py --mode open --rate 20000 --baseline before.json
+    python loadgen.py --getall-ratio 1 --compress --baseline uncompressed.json
+"""
+
+import argparse
+import asyncio
+import collections
+import itertools
+import json
+import random
+import time
+
+import compression
+import const_cs
+import tel
+from clientserver import frame
+
+
+class Workload:
+    """ Produces pre-encoded request frames according to the configured mix """
+
+    def __init__(self, getall_ratio: float, keys: str, key_count: int, zipf_s: float, seed: int):
+        self.getall_ratio = getall_ratio
+        self.rng = random.Random(seed)
+        self.getall = frame('GETALL')
+        self.gets = [frame('GET\n' + name) for name, _ in tel.generate(key_count)]
+        if keys == 'zipf':  # rank k is requested with probability ~ 1 / k^s
+            self.cum_weights = list(itertools.accumulate(1 / k ** zipf_s for k in range(1, key_count + 1)))
+        else:
+            self.cum_weights = None
+
+    def next(self) -> bytes:
+        if self.rng.random() < self.getall_ratio:
+            return self.getall
+        if self.cum_weights is None:
+            return self.rng.choice(self.gets)
+        return self.rng.choices(self.gets, cum_weights=self.cum_weights)[0]
+
+
+class Stats:
+    """ Collected results of all connections """
+
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.bytes_received = 0
+        self.errors = 0
+        self.timeouts = 0
+
+    def report(self, duration: float) -> dict:
+        lat = sorted(self.latencies)
+
+        def percentile(p: float) -> float | None:
+            if not lat:
+                return None
+            return round(lat[min(len(lat) - 1, int(p / 100 * len(lat)))] * 1000, 3)
+
+        return {
+            'requests': len(lat),
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'duration_s': round(duration, 3),
+            'throughput_rps': round(len(lat) / duration, 1) if duration else 0.0,
+            'bytes_received': self.bytes_received,
+            'bandwidth_MBps': round(self.bytes_received / duration / 1e6, 3) if duration else 0.0,
+            'latency_ms': {
+                'mean': round(sum(lat) / len(lat) * 1000, 3) if lat else None,
+                'p50': percentile(50),
+                'p90': percentile(90),
+                'p99': percentile(99),
+                'p999': percentile(99.9),
+                'max': round(lat[-1] * 1000, 3) if lat else None,
+            },
+        }
+
+
+async def connect(args) -> tuple[asyncio.StreamReader, asyncio.StreamWriter, str | None]:
+    """ Open a connection and negotiate compression if requested """
+    reader, writer = await asyncio.open_connection(args.host, args.port)
+    codec = None
+    if args.compress:
+        writer.write(frame('COMPRESS\n' + ','.join(compression.CODECS)))
+        length, _ = compression.split_prefix(await reader.readexactly(4))
+        answer = (await reader.readexactly(length)).decode('utf-8').splitlines()
+        if answer[0] == 'COMPRESSION' and answer[1] != 'none':
+            codec = answer[1]
+    return reader, writer, codec
+
+
+async def read_response(reader: asyncio.StreamReader, codec: str | None) -> int:
+    """ Read (and decompress) one framed response, return its size on the wire """
+    length, compressed = compression.split_prefix(await reader.readexactly(4))
+    body = await reader.readexactly(length)
+    if compressed:
+        compression.decompress(body, codec)
+    return length + 4
+
+
+async def closed_loop(args, workload: Workload, stats: Stats, deadline: float):
+    """ Keep <pipeline> requests outstanding until the deadline """
+    reader, writer, codec = await connect(args)
+    sent = collections.deque()  # send times of outstanding requests, answered in order
+    try:
+        for _ in range(args.pipeline):
+            sent.append(time.perf_counter())
+            writer.write(workload.next())
+        while sent:
+            size = await read_response(reader, codec)
+            now = time.perf_counter()
+            stats.bytes_received += size
+            stats.latencies.append(now - sent.popleft())
+            if now < deadline:
+                sent.append(now)
+                writer.write(workload.next())
+    finally:
+        stats.timeouts += len(sent)
+        writer.close()
+
+
+async def open_loop(args, workload: Workload, stats: Stats, deadline: float):
+    """
+    Send requests with exponentially distributed gaps regardless of outstanding
+    responses. Latency is measured from the scheduled send time, so a slow server
+    cannot hide queueing delay by slowing down the load generator.
+    """
+    reader, writer, codec = await connect(args)
+    scheduled = collections.deque()
+    rate = args.rate / args.connections
+    rng = random.Random()
+
+    async def send():
+        next_time = time.perf_counter()
+        while next_time < deadline:
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            scheduled.append(next_time)
+            writer.write(workload.next())
+            next_time += rng.expovariate(rate)
+
+    sender = asyncio.create_task(send())
+    try:
+        while not (sender.done() and not scheduled):
+            if not scheduled:
+                await asyncio.sleep(0.001)
+                continue
+            size = await read_response(reader, codec)
+            stats.latencies.append(time.perf_counter() - scheduled.popleft())
+            stats.bytes_received += size
+    finally:
+        sender.cancel()
+        stats.timeouts += len(scheduled)
+        writer.close()
+
+
+async def run(args) -> dict:
+    workload = Workload(args.getall_ratio, args.keys, args.key_count, args.zipf_s, args.seed)
+    stats = Stats()
+    loop = closed_loop if args.mode == 'closed' else open_loop
+    start = time.perf_counter()
+    deadline = start + args.duration
+
+    async def connection():
+        try:
+            await asyncio.wait_for(loop(args, workload, stats, deadline), args.duration + args.timeout)
+        except asyncio.TimeoutError:
+            pass  # outstanding requests are counted as timeouts
+        except (OSError, asyncio.IncompleteReadError):
+            stats.errors += 1
+
+    await asyncio.gather(*(connection() for _ in range(args.connections)))
+    report = stats.report(time.perf_counter() - start)
+    report['config'] = {k: v for k, v in vars(args).items() if k not in ('output', 'baseline')}
+    return report
+
+
+def compare(report: dict, baseline: dict) -> dict:
+    """ Relative change of the main figures against a baseline report """
+    def ratio(new, old):
+        return round(new / old, 3) if new is not None and old else None
+
+    return {
+        'throughput': ratio(report['throughput_rps'], baseline['throughput_rps']),
+        'bytes_per_request': ratio(report['bytes_received'] / max(report['requests'], 1),
+                                   baseline['bytes_received'] / max(baseline['requests'], 1)),
+        **{p: ratio(report['latency_ms'][p], baseline['latency_ms'][p]) for p in ('p50', 'p99', 'p999')},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load generator for the phonebook service')
+    parser.add_argument('--host', default=const_cs.HOST)
+    parser.add_argument('--port', type=int, default=const_cs.PORT)
+    parser.add_argument('--connections', type=int, default=8, help='concurrent connections')
+    parser.add_argument('--duration', type=float, default=10, help='seconds to send requests')
+    parser.add_argument('--timeout', type=float, default=5, help='seconds to wait for outstanding responses')
+    parser.add_argument('--getall-ratio', type=float, default=0.0, help='share of GETALL requests')
+    parser.add_argument('--keys', choices=('uniform', 'zipf'), default='uniform', help='key distribution')
+    parser.add_argument('--key-count', type=int, default=len(tel.tel), help='number of distinct names')
+    parser.add_argument('--zipf-s', type=float, default=1.1, help='zipf exponent')
+    parser.add_argument('--mode', choices=('closed', 'open'), default='closed',
+                        help='closed: fixed number of outstanding requests, open: fixed arrival rate')
+    parser.add_argument('--pipeline', type=int, default=1, help='outstanding requests per connection (closed loop)')
+    parser.add_argument('--rate', type=float, default=1000, help='total requests per second (open loop)')
+    parser.add_argument('--compress', action='store_true', help='negotiate response compression')
+    parser.add_argument('--seed', type=int, default=1, help='seed for the request mix')
+    parser.add_argument('--output', help='also write the report to this file')
+    parser.add_argument('--baseline', help='report file of an earlier run to compare with')
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            report['vs_baseline'] = compare(report, json.load(f))
+    result = json.dumps(report, indent=2)
+    print(result)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(result + '\n')
+
+
+if __name__ == '__main__':
+    main()
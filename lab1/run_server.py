@@ -1,4 +1,16 @@
+import argparse
+
 import clientserver
+from telstore import TelStore
+
+parser = argparse.ArgumentParser(description='Phonebook server')
+parser.add_argument('--workers', type=int, default=0,
+                    help='number of worker processes sharing the port via SO_REUSEPORT')
+parser.add_argument('--store', help='serve a phonebook store built with build_telstore.py')
+args = parser.parse_args()
 
-server = clientserver.Server()
-server.serve()
\ No newline at end of file
+if args.workers > 0:
+    clientserver.serve_workers(args.workers, args.store)
+else:
+    server = clientserver.Server(phonebook=TelStore(args.store) if args.store else None)
+    server.serve()
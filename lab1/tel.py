@@ -1,27 +1,28 @@
 # data_generator.py
 
 import random
+from typing import Iterator
 
-# Initialize the dictionary with the original data
-tel = {
+SEED = 4711  # fixed seed, every run (and every store build) sees the same data
+
+# The original data
+BASE_ENTRIES = {
     'jack': '4098',
     'sape': '4139',
     'björn': '0123213231'
 }
 
-# 1. Determine the number of new entries needed
-# Need 1000 - 2 = 998 new entries.
-num_new_entries = 1000 - len(tel)
 
-# 2. Generate the new entries and update the dictionary
-for i in range(1, num_new_entries + 1):
-    # Create a unique key (e.g., 'user_1', 'user_2', ...)
-    key = f'user_{i}'
+def generate(count: int, seed: int = SEED) -> Iterator[tuple[str, str]]:
+    """ Yield <count> phonebook entries: the original data followed by generated users """
+    yield from list(BASE_ENTRIES.items())[:count]
+    rng = random.Random(seed)
 
-    # Generate a random 9-digit number as a string (100000000 to 999999999)
-    value = str(random.randint(100000000, 999999999))
+    # Generate the new entries (e.g., 'user_1', 'user_2', ...)
+    for i in range(1, count - len(BASE_ENTRIES) + 1):
+        # Generate a random 9-digit number as a string (100000000 to 999999999)
+        yield f'user_{i}', str(rng.randint(100000000, 999999999))
 
-    # Add the new key-value pair to the dictionary
-    tel[key] = value
 
-# The dictionary 'tel' now contains 1000 entries.
\ No newline at end of file
+# The dictionary 'tel' contains 1000 entries.
+tel = dict(generate(1000))
@@ -0,0 +1,146 @@
+"""
+Read-only phonebook store in a memory-mapped file
+
+Layout of the file (integers are little endian):
+
+    magic    4 bytes  b'TEL2'
+    count    8 bytes  number of entries n
+    index    8 bytes  file offset of the index section
+    data     records b'<name>\\t<number>', sorted by the utf-8 encoded name
+    index    (n + 1) * 8 bytes  offsets of the records relative to the data section
+
+Opening a store only maps the file, so startup time does not depend on the
+number of entries. All processes opening the same file share its pages
+through the OS page cache.
+"""
+
+import heapq
+import itertools
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from typing import Iterable, Iterator
+
+MAGIC = b'TEL2'
+HEADER = struct.Struct('<4sQQ')
+OFFSET = struct.Struct('<Q')
+RANGE = struct.Struct('<QQ')
+RUN_SIZE = 1_000_000  # max. number of entries sorted in memory while building
+
+
+class TelStore:
+    """ Sorted phonebook snapshot with binary search lookups """
+
+    def __init__(self, path: str):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self._count, self._index = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a phonebook store")
+        self._data = HEADER.size
+
+    @staticmethod
+    def build(path: str, items: Iterable[tuple[str, str]], run_size: int = RUN_SIZE):
+        """
+        Write a store file for the given (name, number) pairs.
+        Inputs larger than run_size are sorted externally: sorted runs are
+        spilled to temporary files and merged, so memory use stays bounded.
+        Of several entries with the same name the last one is kept, as in a dict.
+        """
+        tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            runs: list[str] = []
+            batch: list[tuple[bytes, int, bytes]] = []
+            for seq, (name, number) in enumerate(items):
+                # the input position orders entries with the same name, the last one wins
+                record = (name.encode('utf-8'), seq, number.encode('utf-8'))
+                if b'\t' in record[0] or b'\n' in record[0] or b'\n' in record[2]:
+                    raise ValueError(f"invalid phonebook entry: {name!r}")
+                batch.append(record)
+                if len(batch) >= run_size:
+                    runs.append(_write_run(tmp_dir, len(runs), batch))
+                    batch = []
+            if runs:
+                if batch:
+                    runs.append(_write_run(tmp_dir, len(runs), batch))
+                records: Iterable[tuple[bytes, int, bytes]] = heapq.merge(*(_read_run(run) for run in runs))
+            else:
+                records = sorted(batch)
+            tmp_path = os.path.join(tmp_dir, 'store')
+            _write_store(tmp_path, os.path.join(tmp_dir, 'index'), records)
+            os.replace(tmp_path, path)  # readers never see a partially written file
+        finally:
+            shutil.rmtree(tmp_dir)
+
+    def _record(self, i: int) -> bytes:
+        start, end = RANGE.unpack_from(self._mm, self._index + i * OFFSET.size)
+        return self._mm[self._data + start:self._data + end]
+
+    def get(self, name: str, default: str | None = None) -> str | None:
+        key = name.encode('utf-8')
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            record_name, _, number = self._record(mid).partition(b'\t')
+            if record_name < key:
+                lo = mid + 1
+            elif record_name > key:
+                hi = mid
+            else:
+                return number.decode('utf-8')
+        return default
+
+    def items(self) -> Iterator[tuple[str, str]]:
+        for i in range(self._count):
+            name, _, number = self._record(i).partition(b'\t')
+            yield name.decode('utf-8'), number.decode('utf-8')
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, name: str) -> bool:
+        return self.get(name) is not None
+
+    def close(self):
+        self._mm.close()
+
+
+def _write_run(tmp_dir: str, number: int, batch: list[tuple[bytes, int, bytes]]) -> str:
+    """ Sort a batch of records and spill it to a run file """
+    batch.sort()
+    path = os.path.join(tmp_dir, f'run{number}')
+    with open(path, 'wb') as f:
+        f.writelines(b'%s\t%d\t%s\n' % record for record in batch)
+    return path
+
+
+def _read_run(path: str) -> Iterator[tuple[bytes, int, bytes]]:
+    with open(path, 'rb') as f:
+        for line in f:
+            name, seq, number = line.rstrip(b'\n').split(b'\t', 2)
+            yield name, int(seq), number
+
+
+def _write_store(path: str, index_path: str, records: Iterable[tuple[bytes, int, bytes]]):
+    """ Stream records sorted by (name, input position) into the data section, then append the index """
+    count = 0
+    offset = 0
+    with open(path, 'wb') as f, open(index_path, 'w+b') as index:
+        f.write(HEADER.pack(MAGIC, 0, 0))  # placeholder, fixed below
+        for name, group in itertools.groupby(records, key=lambda record: record[0]):
+            *_, (_, _, number) = group  # of duplicate names keep the last one written
+            record = name + b'\t' + number
+            index.write(OFFSET.pack(offset))
+            f.write(record)
+            offset += len(record)
+            count += 1
+        index.write(OFFSET.pack(offset))
+
+        index_start = f.tell()
+        index.seek(0)
+        shutil.copyfileobj(index, f)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, count, index_start))
+
@@ -2,12 +2,17 @@
 Unit tests for the client-server phonebook service.
 """
 
+import asyncio
 import logging
+import socket
 import threading
 import time
 import unittest
+import unittest.mock
 
+import asyncclient
 import clientserver
+import const_cs
 from context import lab_logging
 from tel import tel  # Import the phone book to verify results
 
@@ -80,6 +85,114 @@ class TestTelService(unittest.TestCase):
         # and return its designated error string.
         self.assertEqual(response, "Malformed GET command")
 
+    def test_getall_cached(self):
+        """Tests that a repeated GETALL is answered from the response cache."""
+        first = self.client.call("GETALL")
+        hits = self._server.cache.hits
+        second = clientserver.Client().call("GETALL")
+        self.assertEqual(first, second)
+        self.assertEqual(self._server.cache.hits, hits + 1)
+
+    def test_cache_invalidated_on_change(self):
+        """Tests that changing an entry invalidates cached GET responses."""
+        self.assertEqual(self.client.call("GET\nsape"), '4139')
+        self._server.set_tel('sape', '4140')
+        try:
+            self.assertEqual(clientserver.Client().call("GET\nsape"), '4140')
+        finally:
+            self._server.set_tel('sape', '4139')
+
+    def test_cache_change_during_request(self):
+        """Tests that a response built while the phonebook changes is not cached as fresh."""
+        original = self._server.get_tel
+
+        def get_tel_then_change(name):
+            result = original(name)
+            self._server.set_tel('jack', '4099')  # concurrent change after the lookup
+            return result
+
+        self._server.set_tel('jack', '4098')  # invalidate earlier cached responses
+        self._server.get_tel = get_tel_then_change
+        try:
+            self._server.handle("GET\njack")
+        finally:
+            del self._server.get_tel
+        try:
+            self.assertEqual(clientserver.Client().call("GET\njack"), '4099')
+        finally:
+            self._server.set_tel('jack', '4098')
+
+    def test_connection_limit(self):
+        """Tests that a server serves at most max_connections connections at a time."""
+        with unittest.mock.patch.object(const_cs, 'PORT', const_cs.PORT + 1):
+            server = clientserver.Server(max_connections=1)
+        thread = threading.Thread(target=server.serve)
+        thread.start()
+        first = socket.create_connection((const_cs.HOST, const_cs.PORT + 1))
+        second = socket.create_connection((const_cs.HOST, const_cs.PORT + 1))  # waits in the backlog
+        try:
+            first.sendall(clientserver.frame("GET\njack"))
+            self.assertEqual(clientserver.recv_all(first, 4 + len('FOUND\n4098'))[4:], b'FOUND\n4098')
+            second.sendall(clientserver.frame("GET\njack"))
+            second.settimeout(0.5)
+            with self.assertRaises(socket.timeout):
+                second.recv(1)  # not served while the first connection is open
+            first.close()
+            second.settimeout(5)
+            self.assertEqual(clientserver.recv_all(second, 4 + len('FOUND\n4098'))[4:], b'FOUND\n4098')
+        finally:
+            first.close()
+            second.close()
+            server._serving = False  # pylint: disable=protected-access
+            thread.join()
+
+    def test_getall_compressed(self):
+        """Tests that a negotiated GETALL response arrives compressed and intact."""
+        client = clientserver.Client(compress=True)
+        self.assertIsNotNone(client.codec)
+        response = client.call("GETALL")
+        self.assertEqual(response, self.client.call("GETALL"))
+        cached = self._server.cache.get(f"{client.codec}:GETALL", self._server.version)
+        self.assertTrue(cached[0] & 0x80, "Cached GETALL frame should be compressed")
+
+    def test_async_client(self):
+        """Tests GET, batched GET and GETALL with the asyncio client."""
+        async def lookups():
+            async with asyncclient.AsyncClient(pool_size=2) as client:
+                return await client.get('jack'), await client.get_many(['sape', 'nobody']), await client.getall()
+
+        number, many, entries = asyncio.run(lookups())
+        self.assertEqual(number, '4098')
+        self.assertEqual(many, {'sape': '4139', 'nobody': None})
+        self.assertEqual(entries, tel)
+
+    def test_async_client_timeout_releases_connection(self):
+        """Tests that a request cancelled by a timeout gives its pool slot back."""
+        async def slow_handler(reader, writer):
+            try:
+                while True:
+                    length = int.from_bytes(await reader.readexactly(4), 'big')
+                    await reader.readexactly(length)
+                    await asyncio.sleep(0.5)  # answers only after the client gave up
+                    writer.write(clientserver.frame('FOUND\n4098'))
+                    await writer.drain()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                writer.close()
+
+        async def lookups():
+            server = await asyncio.start_server(slow_handler, '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            try:
+                async with asyncclient.AsyncClient(host='127.0.0.1', port=port, pool_size=1) as client:
+                    with self.assertRaises(asyncio.TimeoutError):
+                        await asyncio.wait_for(client.get('jack'), 0.2)
+                    return await asyncio.wait_for(client.get('jack'), 2)
+            finally:
+                server.close()
+                await server.wait_closed()
+
+        self.assertEqual(asyncio.run(lookups()), '4098')
+
     def tearDown(self):
         """Closes the client socket after each test."""
         self.client.close()
@@ -0,0 +1,76 @@
+"""
+Unit tests for the memory-mapped phonebook store.
+"""
+
+import os
+import tempfile
+import unittest
+
+import clientserver
+from telstore import TelStore
+
+
+class TestTelStore(unittest.TestCase):
+    """Test suite for TelStore."""
+    entries = {'jack': '4098', 'sape': '4139', 'björn': '0123213231', 'user_10': '123456789'}
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp()
+        os.close(fd)
+        TelStore.build(self.path, self.entries.items())
+        self.store = TelStore(self.path)
+
+    def test_get(self):
+        """Tests lookups of all stored names."""
+        for name, number in self.entries.items():
+            self.assertEqual(self.store.get(name), number)
+
+    def test_get_missing(self):
+        """Tests lookups of names that are not stored."""
+        self.assertIsNone(self.store.get('nonexistent_user'))
+        self.assertIsNone(self.store.get(''))
+        self.assertIsNone(self.store.get('zzz'))
+
+    def test_items(self):
+        """Tests that all entries are returned in sorted order."""
+        self.assertEqual(len(self.store), len(self.entries))
+        self.assertEqual(dict(self.store.items()), self.entries)
+        names = [name.encode('utf-8') for name, _ in self.store.items()]
+        self.assertEqual(names, sorted(names))
+
+    def test_build_external(self):
+        """Tests building from several sorted runs with duplicate names."""
+        items = [(f'user_{i}', str(i)) for i in range(100)] + [('jack', '4098'), ('user_7', '7')]
+        TelStore.build(self.path, items, run_size=16)
+        store = TelStore(self.path)
+        self.assertEqual(len(store), 101)
+        self.assertEqual(store.get('user_42'), '42')
+        self.assertEqual(store.get('jack'), '4098')
+        store.close()
+
+    def test_build_duplicates_last_wins(self):
+        """Tests that the last entry of a duplicate name is kept, within and across runs."""
+        items = [('jack', '9'), ('sape', '1')] + [(f'user_{i}', str(i)) for i in range(40)] \
+            + [('jack', '1'), ('sape', '5'), ('sape', '2')]
+        for run_size in (1000, 16):
+            TelStore.build(self.path, items, run_size=run_size)
+            store = TelStore(self.path)
+            self.assertEqual(store.get('jack'), '1')
+            self.assertEqual(store.get('sape'), '2')
+            self.assertEqual(dict(store.items()), dict(items))
+            store.close()
+
+    def test_set_read_only(self):
+        """Tests that changing a server's read-only store fails with a clear error."""
+        server = clientserver.Server.__new__(clientserver.Server)
+        server.phonebook = self.store
+        with self.assertRaisesRegex(TypeError, 'read-only'):
+            server.set_tel('jack', '1')
+
+    def tearDown(self):
+        self.store.close()
+        os.remove(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,2 +1,20 @@
 OK = '1'
-APPEND = '2'
+
+# methods of the DBList service
+APPEND = 'append'
+LIST_CREATE = 'list_create'
+LIST_APPEND = 'list_append'
+LIST_EXTEND = 'list_extend'
+LIST_SLICE = 'list_slice'
+LIST_LEN = 'list_len'
+LIST_DROP = 'list_drop'
+
+BATCH = 'batch'  # envelope carrying many calls in one request
+
+# reply types
+ACK = 'ACK'
+RESULT = 'RESULT'
+BUSY = 'BUSY'
+ERROR = 'ERROR'
+
+PROCESSING_DELAY = 3  # simulated processing time of a call in seconds
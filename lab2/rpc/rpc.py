@@ -1,7 +1,12 @@
+import asyncio
 import constRPC
+import itertools
+import pickle
 import threading
 import time
 import logging
+from collections import OrderedDict
+from concurrent import futures
 
 from context import lab_channel
 
@@ -11,113 +16,629 @@ class DBList:
         self.value = list(basic_list)
 
     def append(self, data):
-        self.value = self.value + [data]
+        self.value.append(data)  # in place, amortised O(1)
         return self
 
 
-class Client:
+class RemoteError(Exception):
+    """A call failed on the server."""
+
+
+class ServerBusy(Exception):
+    """The server rejected a call because its request queue was full."""
+
+
+def exposed(function=None, *, inline=False, cache=False):
+    """
+    Decorator marking a service method as callable by clients
+    (like the 'exposed_' prefix of rpyc).
+    inline=True: short call, executed right away by the server's receiving
+    thread and answered without ACK. Other calls run on the server's pool.
+    cache=True: pure function, the server may answer repeated calls with
+    equal arguments from its result cache.
+    """
+    def mark(f):
+        f.rpc_inline = inline
+        f.rpc_cache = cache
+        return f
+    return mark(function) if function is not None else mark
+
+
+class DBListService:
+    """The service offered by the server: DBList values and server-resident lists."""
+
     def __init__(self):
+        # server-resident lists: handle -> list
+        self.lists = {}
+        self.handles = itertools.count()
+
+    @staticmethod
+    @exposed(cache=True)
+    def append(data, db_list):
+        assert isinstance(db_list, DBList)  # - Make sure we have a list
+        time.sleep(constRPC.PROCESSING_DELAY)  # simulate long processing
+        return db_list.append(data)
+
+    @exposed(inline=True)
+    def list_create(self, items):
+        handle = str(next(self.handles))
+        self.lists[handle] = list(items)
+        return handle
+
+    @exposed(inline=True)
+    def list_append(self, handle, item):
+        lst = self.lists[handle]
+        lst.append(item)
+        return len(lst)
+
+    @exposed(inline=True)
+    def list_extend(self, handle, items):
+        lst = self.lists[handle]
+        lst.extend(items)
+        return len(lst)
+
+    @exposed(inline=True)
+    def list_slice(self, handle, start, stop):
+        return self.lists[handle][start:stop]
+
+    @exposed(inline=True)
+    def list_len(self, handle):
+        return len(self.lists[handle])
+
+    @exposed(inline=True)
+    def list_drop(self, handle):
+        del self.lists[handle]
+
+
+class RemoteList:
+    """
+    Client-side handle of a list that lives on the server.
+    Only deltas and requested slices travel over the channel, so the payload
+    of a call does not depend on the length of the list.
+    All operations return futures.
+    """
+
+    def __init__(self, client, handle):
+        self.client = client
+        self.handle = handle
+
+    def append(self, item):
+        # future: new length of the list
+        return self.client.call(constRPC.LIST_APPEND, self.handle, item)
+
+    def extend(self, items):
+        # future: new length of the list
+        return self.client.call(constRPC.LIST_EXTEND, self.handle, list(items))
+
+    def slice(self, start=0, stop=None):
+        # future: list of the items in [start:stop]
+        return self.client.call(constRPC.LIST_SLICE, self.handle, start, stop)
+
+    def length(self):
+        return self.client.call(constRPC.LIST_LEN, self.handle)
+
+    def drop(self):
+        # release the list on the server
+        return self.client.call(constRPC.LIST_DROP, self.handle)
+
+
+class Batch:
+    """
+    Collects calls and sends them in one request when the with-block ends.
+    The server answers with one reply holding all results, each call still
+    gets its own future.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+        self.futures = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.send()
+
+    def call(self, method, *args):
+        future = futures.Future()
+        self.calls.append((method, args))
+        self.futures.append(future)
+        return future
+
+    def send(self):
+        if self.calls:
+            self.client.call(constRPC.BATCH, self.calls).add_done_callback(self._distribute)
+
+    def _distribute(self, batch_future):
+        if batch_future.exception() is not None:  # BUSY or failed batch
+            for future in self.futures:
+                future.set_exception(batch_future.exception())
+            return
+        for future, (ok, value) in zip(self.futures, batch_future.result()):
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(RemoteError(value))
+
+
+class Client:
+    def __init__(self, ack=True, retry_after=None, retries=0):
         self.chan = lab_channel.Channel()
         self.client = self.chan.join('client')
         self.server = None
-        # added logging + response thread
+        self.timeout = 1  # dispatcher checks for stop requests at least every second
+        self.ack = ack  # ask the server to acknowledge pooled calls
+        # resend a call without reply after retry_after seconds, at most retries times
+        self.retry_after = retry_after
+        self.retries = retries
+        # added logging + dispatcher thread
         self.logger = logging.getLogger('vs2lab.lab2.rpc.Client')
-        self.response_thread = None
+        self.dispatcher = None
+        self.stopping = threading.Event()
+        # outstanding calls: correlation id -> future
+        self.pending = {}
+        self.pending_lock = threading.Lock()
+        self.call_ids = itertools.count()
+        # calls that may be resent: correlation id -> [message, deadline, retries left, retry_after]
+        self.retrying = {}
+        self.shortest_retry = retry_after  # smallest retry_after in use, bounds how long the dispatcher blocks
 
     def run(self):
         self.chan.bind(self.client)
         self.server = self.chan.subgroup('server')
+        # one background dispatcher routes all replies to their futures
+        self.dispatcher = threading.Thread(target=self._dispatch)
+        self.dispatcher.daemon = True
+        self.dispatcher.start()
 
-    def stop(self):
-        # wait for response thread to complete if it exists
-        if self.response_thread is not None and self.response_thread.is_alive():
-            self.logger.info("Waiting for response thread to complete...")
-            self.response_thread.join(timeout=15)
+    def stop(self, timeout=15):
+        # wait for outstanding calls to complete
+        with self.pending_lock:
+            pending = list(self.pending.values())
+        if pending:
+            self.logger.info("Waiting for {} outstanding calls to complete...".format(len(pending)))
+            futures.wait(pending, timeout=timeout)
+        self.stopping.set()
+        if self.dispatcher is not None:
+            self.dispatcher.join()
         self.chan.leave('client')
-    
+
+    def call(self, method, *args, callback=None, ack=None, retry_after=None, retries=None):
+        """
+        Asynchronous rpc call. Returns a concurrent.futures.Future for the result.
+        The future is marked running once the server acknowledged the request.
+        An optional callback is called with the result in the dispatcher thread.
+        ack=False saves the ACK message (default: the client's ack setting).
+        Without a reply after retry_after seconds the request is resent with the
+        same call id, so the server recognises it and does not execute it twice.
+        Once the server acknowledged the call it is no longer resent, so retries
+        only cover requests that never arrived (with ack=False every call is resent
+        until its reply, choose retry_after above its running time).
+        After the last retry the future fails with a TimeoutError.
+        """
+        call_id = '{}:{}'.format(self.client, next(self.call_ids))  # unique correlation id
+        future = futures.Future()
+        if callback is not None:
+            future.add_done_callback(lambda f: self._run_callback(callback, f))
+        ack = self.ack if ack is None else ack
+        message = (call_id, method, args, ack)
+        retry_after = self.retry_after if retry_after is None else retry_after
+        with self.pending_lock:
+            self.pending[call_id] = future
+            if retry_after is not None:
+                retries = self.retries if retries is None else retries
+                self.retrying[call_id] = [message, time.monotonic() + retry_after, retries, retry_after]
+                self.shortest_retry = min(retry_after, self.shortest_retry or retry_after)
+        self.chan.send_to(self.server, message)  # send msg to server
+        return future
+
+    def batch(self):
+        """Batch of calls sent in one request, use as: with client.batch() as b: b.call(...)"""
+        return Batch(self)
+
+    def create_list(self, items=()):
+        """Create a list on the server. Returns a future for its RemoteList handle."""
+        proxy = futures.Future()
+
+        def wrap(f):
+            if f.exception() is not None:
+                proxy.set_exception(f.exception())
+            else:
+                proxy.set_result(RemoteList(self, f.result()))
+        self.call(constRPC.LIST_CREATE, list(items)).add_done_callback(wrap)
+        return proxy
+
+    def call_async(self, method, *args):
+        # same as call, but awaitable from asyncio code
+        return asyncio.wrap_future(self.call(method, *args))
+
     def append(self, data, db_list, callback=None):
         # asynchronous rcp call to server's append method
         assert isinstance(db_list, DBList)
-        msglst = (constRPC.APPEND, data, db_list)  # message payload
-        self.chan.send_to(self.server, msglst)  # send msg to server
+        return self.call(constRPC.APPEND, data, db_list, callback=callback)
 
-        # added non-blockiing wait for response with background thread
-        if callback is not None:
-            self.response_thread = threading.Thread(
-                target=self._wait_for_response,
-                args=(callback,)
-            )
-            self.response_thread.daemon = False
-            self.response_thread.start()
-    
-    def _wait_for_response(self, callback):
-        # client method to wait for server response in background thread
+    def _run_callback(self, callback, future):
+        if future.cancelled():
+            return
         try:
-            while True:
-                msgrcv = self.chan.receive_from(self.server)
-                response = msgrcv[1]
-                
-                # check if this is an ACK or result
-                if isinstance(response, tuple) and len(response) == 2 and response[0] == 'ACK':
-                    self.logger.info("Received ACK from server, waiting for actual result...")
-                    continue  # wait for actual result
-                
-                self.logger.info("Received final response from server")
-                # Call the callback function with the result
-                callback(response)
-                break
+            callback(future.result())
         except Exception as e:
-            self.logger.error(f"Error waiting for response: {e}")
+            self.logger.error(f"Error in callback: {e}")
 
+    def _resend_overdue(self):
+        # resend calls without reply, give up on those out of retries
+        now = time.monotonic()
+        resend, expired = [], []
+        with self.pending_lock:
+            for call_id, state in list(self.retrying.items()):
+                message, deadline, retries_left, retry_after = state
+                if now < deadline:
+                    continue
+                if retries_left > 0:
+                    state[1] = now + retry_after
+                    state[2] -= 1
+                    resend.append(message)
+                else:
+                    del self.retrying[call_id]
+                    expired.append((call_id, self.pending.pop(call_id, None)))
+        for message in resend:
+            self.logger.warning(f"No reply for call {message[0]}, resending")
+            self.chan.send_to(self.server, message)
+        for call_id, future in expired:
+            self.logger.warning(f"Call {call_id} timed out")
+            if future is not None and not future.done():
+                future.set_exception(futures.TimeoutError(call_id))
+
+    def _next_wait(self):
+        # block until the earliest retry deadline, but at most self.timeout seconds;
+        # calls made while blocking are noticed within the shortest retry_after
+        with self.pending_lock:
+            wait = min(self.timeout, self.shortest_retry or self.timeout)
+            if self.retrying:
+                wait = min(wait, min(state[1] for state in self.retrying.values()) - time.monotonic())
+        return max(0.01, wait)  # a timeout of 0 would block forever
+
+    def _dispatch(self):
+        # route ACKs and results to the futures of their calls
+        while not self.stopping.is_set():
+            msgrcv = self.chan.receive_from(self.server, self._next_wait())
+            if msgrcv is not None:
+                self._route(msgrcv[1])
+            # only after routing: a reply that just arrived must not trigger a resend
+            if self.retrying:
+                self._resend_overdue()
+
+    def _route(self, response):
+        kind, call_id = response[0], response[1]
+        with self.pending_lock:
+            future = self.pending.get(call_id)
+            if kind in (constRPC.RESULT, constRPC.ERROR, constRPC.BUSY):
+                self.pending.pop(call_id, None)
+                self.retrying.pop(call_id, None)
+            elif kind == constRPC.ACK:
+                # the server has the request and will answer it, however long it runs
+                self.retrying.pop(call_id, None)
+        if future is None:
+            self.logger.warning(f"Dropping reply for unknown call {call_id}")
+        elif kind == constRPC.ACK:
+            self.logger.info(f"Received ACK for call {call_id}, waiting for actual result...")
+            if not (future.running() or future.done()):
+                future.set_running_or_notify_cancel()
+        elif kind == constRPC.RESULT:
+            self.logger.info(f"Received result for call {call_id}")
+            if not future.cancelled():
+                future.set_result(response[2])
+        elif kind == constRPC.ERROR:
+            self.logger.warning(f"Call {call_id} failed: {response[2]}")
+            if not future.cancelled():
+                future.set_exception(RemoteError(response[2]))
+        elif kind == constRPC.BUSY:
+            self.logger.warning(f"Server busy, call {call_id} rejected")
+            if not future.cancelled():
+                future.set_exception(ServerBusy(call_id))
+        else:
+            self.logger.warning(f"Unexpected reply {kind} for call {call_id}")
+
+
+class Metrics:
+    """Queue depth and timing figures of a server, updated from several threads."""
 
-class Server:
     def __init__(self):
+        self.lock = threading.Lock()
+        self.accepted = 0
+        self.rejected = 0
+        self.duplicates = 0  # retried requests answered without executing them again
+        self.cache_hits = 0
+        self.completed = 0
+        self.in_flight = 0  # accepted, but not yet completed
+        self.service_time = 0.0  # summed processing time of completed calls
+        self.max_service_time = 0.0
+        self.wait_time = 0.0  # summed queueing time of completed calls
+
+    def snapshot(self, workers):
+        with self.lock:
+            done = max(self.completed, 1)
+            return {
+                'accepted': self.accepted,
+                'rejected': self.rejected,
+                'duplicates': self.duplicates,
+                'cache_hits': self.cache_hits,
+                'completed': self.completed,
+                'in_flight': self.in_flight,
+                'queue_depth': max(0, self.in_flight - workers),
+                'mean_service_s': round(self.service_time / done, 3),
+                'max_service_s': round(self.max_service_time, 3),
+                'mean_wait_s': round(self.wait_time / done, 3),
+            }
+
+
+class RequestTable:
+    """
+    Calls seen by the server: call id -> entry of the still running or answered call.
+    A retried request carries the id of its first attempt, so the server can answer
+    it from here instead of executing the call again. Answered entries are evicted
+    ttl seconds after their reply.
+    """
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self.lock = threading.Lock()  # replies are sent from pool threads
+        self.entries = {}  # call id -> {'clients', 'reply', 'answered'}
+
+    def begin(self, call_id, client):
+        """Register a new call. For a known call id return its entry, after
+        attaching the client if the call is still running."""
+        with self.lock:
+            entry = self.entries.get(call_id)
+            if entry is None:
+                self.entries[call_id] = {'clients': {client}, 'reply': None, 'answered': None}
+            elif entry['reply'] is None:
+                entry['clients'].add(client)
+            return entry
+
+    def finish(self, call_id, reply):
+        """Store the reply, return the clients waiting for it."""
+        with self.lock:
+            entry = self.entries.get(call_id)
+            if entry is None:
+                return set()
+            entry['reply'] = reply
+            entry['answered'] = time.monotonic()
+            return entry['clients']
+
+    def forget(self, call_id):
+        # call was not executed (rejected), a retry must be handled as a new call
+        with self.lock:
+            self.entries.pop(call_id, None)
+
+    def evict(self):
+        """Drop answered entries older than ttl, return their number."""
+        limit = time.monotonic() - self.ttl
+        with self.lock:
+            expired = [call_id for call_id, entry in self.entries.items()
+                       if entry['answered'] is not None and entry['answered'] < limit]
+            for call_id in expired:
+                del self.entries[call_id]
+        return len(expired)
+
+
+class ResultCache:
+    """
+    LRU cache of results of pure methods, keyed by method name and pickled arguments.
+    Bounded by the summed size of the pickled keys and results.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (result, size)
+
+    @staticmethod
+    def key(name, args):
+        try:
+            return name, pickle.dumps(args)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return None  # arguments cannot be compared, do not cache
+
+    def get(self, key):
+        # (True, result) on a hit, None on a miss
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            self.entries.move_to_end(key)  # mark as most recently used
+            return True, entry[0]
+
+    def put(self, key, result):
+        try:
+            size = len(key[1]) + len(pickle.dumps(result))
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            self.entries[key] = (result, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)  # evict least recently used
+                self.size -= evicted
+
+
+def _invoke(function, args):
+    # run a call, return (ok, result or error message)
+    try:
+        return True, function(*args)
+    except KeyError as e:
+        return False, f"unknown key {e}"
+    except Exception as e:
+        return False, repr(e)
+
+
+def _execute(calls):
+    # runs in a pool worker (thread or process), returns outcomes and service time
+    start = time.perf_counter()
+    outcomes = [_invoke(function, args) for function, args in calls]
+    return outcomes, time.perf_counter() - start
+
+
+class Server:
+    def __init__(self, service=None, max_workers=4, max_pending=16, use_processes=False,
+                 request_ttl=60, cache_bytes=1 << 20):
+        """
+        Serves the exposed methods of a service object (default: DBListService).
+        With use_processes, pooled methods must be picklable (e.g. static methods).
+        Retried requests are recognised for request_ttl seconds after their reply.
+        Results of methods exposed with cache=True are kept up to cache_bytes.
+        """
         self.chan = lab_channel.Channel()
         self.server = self.chan.join('server')
         self.timeout = 3
         # added logging
         self.logger = logging.getLogger('vs2lab.lab2.rpc.Server')
-
-    @staticmethod
-    def append(data, db_list):
-        assert isinstance(db_list, DBList)  # - Make sure we have a list
-        return db_list.append(data)
+        # bounded pool: at most max_workers calls run, max_pending more may wait
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        if use_processes:
+            self.executor = futures.ProcessPoolExecutor(max_workers)
+        else:
+            self.executor = futures.ThreadPoolExecutor(max_workers)
+        self.metrics = Metrics()
+        self.metrics_interval = 10  # seconds between metric log lines
+        self.requests = RequestTable(request_ttl)
+        self.results = ResultCache(cache_bytes)
+        # method registry: name -> (function, inline, cache)
+        self.service = DBListService() if service is None else service
+        self.methods = {}
+        for name in dir(type(self.service)):
+            function = getattr(self.service, name)
+            if getattr(function, 'rpc_inline', None) is not None:
+                self.methods[name] = (function, function.rpc_inline, function.rpc_cache)
+        self.logger.info(f"Exposed methods: {sorted(self.methods)}")
 
     def run(self):
         self.chan.bind(self.server)
+        next_report = time.monotonic() + self.metrics_interval
         while True:
             msgreq = self.chan.receive_from_any(self.timeout)  # wait for any request
             if msgreq is not None:
                 client = msgreq[0]  # see who is the caller
-                msgrpc = msgreq[1]  # fetch call & parameters
-                if constRPC.APPEND == msgrpc[0]:  # check what is being requested
-
-                    # server sends ACK
-                    self.chan.send_to({client}, ('ACK', None))
-                    self.logger.info(f"Sent ACK to client {client}")
-                    
-                    # process the request in a separate thread to simulate long-running operation
-                    processing_thread = threading.Thread(
-                        target=self._process_request,
-                        args=(client, msgrpc)
-                    )
-                    processing_thread.daemon = True
-                    processing_thread.start()
-                else:
-                    pass  # unsupported request, simply ignore
+                call_id, method, args, ack = msgreq[1]  # fetch call id, call, parameters & ack option
+                self._handle(client, call_id, method, args, ack)
+            if time.monotonic() >= next_report:
+                evicted = self.requests.evict()
+                self.logger.info(f"Metrics: {self.get_metrics()}, evicted {evicted} answered requests")
+                next_report = time.monotonic() + self.metrics_interval
+
+    def get_metrics(self):
+        return self.metrics.snapshot(self.max_workers)
+
+    def _handle(self, client, call_id, method, args, ack):
+        entry = self.requests.begin(call_id, client)
+        if entry is not None:  # retried request: answer it, but do not execute it again
+            with self.metrics.lock:
+                self.metrics.duplicates += 1
+            if entry['reply'] is not None:
+                self.logger.info(f"Duplicate call {call_id}, resending its result")
+                self.chan.send_to({client}, entry['reply'])
+            else:
+                self.logger.info(f"Duplicate call {call_id}, still running")
+                if ack:
+                    self.chan.send_to({client}, (constRPC.ACK, call_id))
+            return
+
+        if method == constRPC.BATCH:
+            calls = args[0]
+        else:
+            calls = [(method, args)]
+
+        # look up all calls, cached and inline ones are answered right away
+        outcomes = [None] * len(calls)
+        pooled = []  # (index, function, args, cache key)
+        for i, (name, call_args) in enumerate(calls):
+            if name not in self.methods:
+                self.logger.warning(f"Call {call_id} requested unknown method {name}")
+                outcomes[i] = (False, f"unknown method {name}")
+                continue
+            function, inline, cache = self.methods[name]
+            key = self.results.key(name, call_args) if cache else None
+            if key is not None:
+                outcomes[i] = self.results.get(key)
+                if outcomes[i] is not None:
+                    with self.metrics.lock:
+                        self.metrics.cache_hits += 1
+                    continue
+            if inline:
+                outcomes[i] = _invoke(function, call_args)
+                if key is not None and outcomes[i][0]:
+                    self.results.put(key, outcomes[i][1])
+            else:
+                pooled.append((i, function, call_args, key))
+
+        if not pooled:
+            self._reply(call_id, method, outcomes)
+        else:
+            self._submit(client, call_id, method, outcomes, pooled, ack)
 
-    # process request in background: pause 10 seconds then send result
+    # send single result/error or all outcomes of a batch to all clients waiting for the call
+    def _reply(self, call_id, method, outcomes):
+        if method == constRPC.BATCH:
+            reply = (constRPC.RESULT, call_id, outcomes)
+        else:
+            ok, value = outcomes[0]
+            reply = (constRPC.RESULT if ok else constRPC.ERROR, call_id, value)
+        self.chan.send_to(self.requests.finish(call_id, reply), reply)
+
+    # admit pooled calls to the pool or reject them with BUSY if the queue is full
     # client -> client id for response
-    # msgrpc -> the rpc message
-    def _process_request(self, client, msgrpc):
+    # call_id -> correlation id of the call
+    def _submit(self, client, call_id, method, outcomes, pooled, ack):
+        with self.metrics.lock:
+            admitted = self.metrics.in_flight < self.max_workers + self.max_pending
+            if admitted:
+                self.metrics.in_flight += 1
+                self.metrics.accepted += 1
+            else:
+                self.metrics.rejected += 1
+        if not admitted:
+            self.requests.forget(call_id)
+            self.chan.send_to({client}, (constRPC.BUSY, call_id))
+            self.logger.warning(f"Queue full, rejected call {call_id} of client {client}")
+            return
+
+        if ack:  # server sends ACK
+            self.chan.send_to({client}, (constRPC.ACK, call_id))
+            self.logger.info(f"Sent ACK for call {call_id} to client {client}")
+
+        submitted = time.perf_counter()
+        job = [(function, args) for _, function, args, _ in pooled]
+        future = self.executor.submit(_execute, job)
+        future.add_done_callback(
+            lambda f: self._complete(client, call_id, method, outcomes, pooled, submitted, f))
+
+    # send result of completed pooled calls back to the client
+    def _complete(self, client, call_id, method, outcomes, pooled, submitted, future):
+        total = time.perf_counter() - submitted
+        with self.metrics.lock:
+            self.metrics.in_flight -= 1
         try:
-            self.logger.info(f"Processing request from client {client}")
-            # simulate long processing
-            time.sleep(3)
-            
-            # do the actual work
-            result = self.append(msgrpc[1], msgrpc[2])  # local call
-            self.logger.info(f"Processing complete, sending result to client {client}")
-            self.chan.send_to({client}, result)
-        except Exception as e:
+            job_outcomes, service_time = future.result()
+        except Exception as e:  # e.g. a method that cannot be sent to a process pool
             self.logger.error(f"Error processing request: {e}")
+            job_outcomes, service_time = [(False, repr(e))] * len(pooled), total
+        for (i, _, _, key), outcome in zip(pooled, job_outcomes):
+            outcomes[i] = outcome
+            if key is not None and outcome[0]:
+                self.results.put(key, outcome[1])
+        with self.metrics.lock:
+            self.metrics.completed += 1
+            self.metrics.service_time += service_time
+            self.metrics.max_service_time = max(self.metrics.max_service_time, service_time)
+            self.metrics.wait_time += max(0.0, total - service_time)
+        self.logger.info(f"Processing complete, sending result of call {call_id} to client {client}")
+        self._reply(call_id, method, outcomes)
@@ -20,10 +20,11 @@ cl.run()
 # create initial list
 base_list = rpc.DBList({'foo'})
 
-# make asynchronous RPC call with callback
-logger.info("Making asynchronous RPC call...")
-cl.append('bar', base_list, callback=result_callback)
-#cl.append('test', base_list, callback=result_callback)
+# make concurrent asynchronous RPC calls with callback,
+# each call gets its own future (correlated by call id)
+logger.info("Making asynchronous RPC calls...")
+future_bar = cl.append('bar', base_list, callback=result_callback)
+future_test = cl.append('test', base_list, callback=result_callback)
 
 # simulate that client continues to work while waiting for response
 logger.info("Client continues to do other work while waiting for server response...")
@@ -31,7 +32,15 @@ for i in range(12):
     print(f"[Client] Doing other work... ({i+1}s)")
     time.sleep(1)
 
-logger.info("Main client activity finished. Waiting for response thread...")
+# server-resident list: only the appended items travel to the server
+remote_list = cl.create_list(['foo']).result()
+for item in ['bar', 'test']:
+    remote_list.append(item)
+logger.info("Remote list length: {}".format(remote_list.extend(range(3)).result()))
+logger.info("Remote list: {}".format(remote_list.slice().result()))
+
+logger.info("Main client activity finished. Waiting for outstanding calls...")
+logger.info("Results: {} / {}".format(future_bar.result().value, future_test.result().value))
 
 cl.stop()
 logger.info("Client stopped.")
@@ -1,3 +1,4 @@
+import argparse
 import logging
 
 import rpc
@@ -6,14 +7,20 @@ from context import lab_channel, lab_logging
 lab_logging.setup(stream_level=logging.INFO)
 logger = logging.getLogger('vs2lab.lab2.rpc.runsrv')
 
-chan = lab_channel.Channel()
-chan.channel.flushall()
-logger.debug('Flushed all redis keys.')
+if __name__ == '__main__':  # required for process pools on platforms that spawn workers
+    parser = argparse.ArgumentParser(description='Asynchronous RPC server')
+    parser.add_argument('--workers', type=int, default=4, help='calls processed in parallel')
+    parser.add_argument('--pending', type=int, default=16, help='calls waiting before BUSY replies')
+    parser.add_argument('--processes', action='store_true', help='use a process pool instead of threads')
+    args = parser.parse_args()
 
-# added logging for threading
-logger.info('Starting asynchronous RPC server...')
-logger.info('Server will acknowledge requests immediately and process them asynchronously.')
+    chan = lab_channel.Channel()
+    chan.channel.flushall()
+    logger.debug('Flushed all redis keys.')
 
-srv = rpc.Server()
-srv.run()
+    # added logging for threading
+    logger.info('Starting asynchronous RPC server...')
+    logger.info('Server will acknowledge requests immediately and process them asynchronously.')
 
+    srv = rpc.Server(max_workers=args.workers, max_pending=args.pending, use_processes=args.processes)
+    srv.run()
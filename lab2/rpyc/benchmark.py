@@ -0,0 +1,90 @@
+"""
+Benchmark of the rpyc DBList service against the channel-based RPC in lab2/rpc
+
+Measures appending items one by one, appending them in one bulk call and
+reading them back in chunks. Start the rpyc server (server.py), redis and the
+rpc server (../rpc/runsrv.py) first.
+
+Examples:
+    python benchmark.py --items 5000
+    python benchmark.py --items 100000 --chunk 5000 --skip-rpc
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import constRPYC
+import rpyc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'rpc'))
+import rpc  # noqa: E402  pylint: disable=wrong-import-position
+
+
+def timed(function) -> float:
+    start = time.perf_counter()
+    function()
+    return round(time.perf_counter() - start, 4)
+
+
+def bench_rpyc(items: int, chunk: int) -> dict:
+    conn = rpyc.connect(constRPYC.SERVER, constRPYC.PORT)
+    dblist = conn.root
+    offset = dblist.length()  # the store is shared, skip items of earlier runs
+
+    def read():
+        assert sum(len(batch) for batch in dblist.iter(chunk)) == offset + 2 * items
+
+    results = {
+        'append_each_s': timed(lambda: [dblist.append(i) for i in range(items)]),
+        'extend_s': timed(lambda: dblist.extend(tuple(range(items)))),
+        'read_chunked_s': timed(read),
+        'read_value_s': timed(dblist.value),
+    }
+    conn.close()
+    return results
+
+
+def bench_rpc(items: int, chunk: int) -> dict:
+    client = rpc.Client(ack=False)
+    client.run()
+    remote_list = client.create_list().result()
+
+    def read():
+        total = 0
+        while True:
+            batch = remote_list.slice(total, total + chunk).result()
+            if not batch:
+                break
+            total += len(batch)
+        assert total == 3 * items
+
+    results = {
+        'append_each_s': timed(lambda: [remote_list.append(i).result() for i in range(items)]),
+        # calls are asynchronous, so the appends can also be pipelined
+        'append_pipelined_s': timed(lambda: [f.result() for f in [remote_list.append(i) for i in range(items)]]),
+        'extend_s': timed(lambda: remote_list.extend(range(items)).result()),
+        'read_chunked_s': timed(read),
+    }
+    remote_list.drop().result()
+    client.stop()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the rpyc DBList service with lab2/rpc')
+    parser.add_argument('--items', type=int, default=2000, help='items appended per operation')
+    parser.add_argument('--chunk', type=int, default=constRPYC.CHUNK, help='items per read batch')
+    parser.add_argument('--skip-rpc', action='store_true', help='only benchmark rpyc')
+    args = parser.parse_args()
+
+    report = {'items': args.items, 'chunk': args.chunk, 'rpyc': bench_rpyc(args.items, args.chunk)}
+    if not args.skip_rpc:
+        report['rpc'] = bench_rpc(args.items, args.chunk)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -15,10 +15,16 @@ logger.info("Connected.")
 dblist = conn.root
 
 ret = dblist.append(2)  # Call an exposed operation,
-logger.info("Append 2: '{}'".format(str(ret)))
+logger.info("Append 2, length: '{}'".format(str(ret)))
 
 ret = dblist.append(4)  # and append two elements
-logger.info("Append 4: '{}'".format(str(ret)))
+logger.info("Append 4, length: '{}'".format(str(ret)))
+
+ret = dblist.extend((6, 8, 10))  # Append several elements in one call
+logger.info("Extend, length: '{}'".format(str(ret)))
 
 ret = dblist.value()  # Print the result
 logger.info("Stored value: '{}'".format(str(ret)))
+
+for batch in dblist.iter(2):  # Stream the list in batches
+    logger.info("Batch: '{}'".format(str(batch)))
@@ -1,2 +1,3 @@
 SERVER = "127.0.0.1"
 PORT = 12345
+CHUNK = 1000  # items per batch when streaming a list
@@ -1,8 +1,10 @@
 import logging
+import threading
 from typing import List, Any
 
 import constRPYC
 import rpyc
+from rpyc.utils.helpers import classpartial
 from rpyc.utils.server import ThreadedServer
 
 from context import lab_logging
@@ -11,19 +13,69 @@ lab_logging.setup()
 logger = logging.getLogger("vs2lab.lab2.rpyc.server")
 
 
+class ListStore:
+    """ List shared by all connections, guarded by a lock (connections run in their own threads) """
+
+    def __init__(self):
+        self.items: List[Any] = []
+        self.lock = threading.Lock()
+
+    def append(self, data) -> int:
+        with self.lock:
+            self.items.append(data)  # in place, amortised O(1)
+            return len(self.items)
+
+    def extend(self, items) -> int:
+        with self.lock:
+            self.items.extend(items)
+            return len(self.items)
+
+    def slice(self, start, stop) -> tuple:
+        with self.lock:
+            return tuple(self.items[start:stop])
+
+    def __len__(self):
+        with self.lock:
+            return len(self.items)
+
+
 class DBList(rpyc.Service):
-    value: List[Any] = [] # not visible from remote
+    """
+    Results are returned as tuples: rpyc copies tuples of plain values in one
+    message, while lists would be sent as netrefs costing one round trip per
+    element access.
+    """
+
+    def __init__(self, store: ListStore = None):
+        self.store = ListStore() if store is None else store  # not visible from remote
 
     # visible functions start with 'exposed_'
     def exposed_append(self, data):
-        self.value = self.value + [data]
-        return self.value
+        return self.store.append(data)  # new length, not the whole list
+
+    def exposed_extend(self, items):
+        # pass a tuple: a list argument would be a netref, read element by element
+        return self.store.extend(tuple(items))
+
+    def exposed_length(self):
+        return len(self.store)
 
     def exposed_value(self):
-        return self.value
+        return self.store.slice(None, None)
+
+    def exposed_iter(self, chunk=constRPYC.CHUNK):
+        # batches of up to chunk items, one round trip per batch
+        start = 0
+        while True:
+            batch = self.store.slice(start, start + chunk)
+            if not batch:
+                return
+            yield batch
+            start += len(batch)
 
 
 if __name__ == "__main__":
-    server = ThreadedServer(DBList, port=constRPYC.PORT)
+    # all connections share one store
+    server = ThreadedServer(classpartial(DBList, ListStore()), port=constRPYC.PORT)
     logger.info("Server starting...")
     server.start()
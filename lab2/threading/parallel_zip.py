@@ -0,0 +1,285 @@
+"""
+Parallel, streaming zip archiver
+
+Like AsyncZip the archive is written by a background thread, but the input is
+cut into chunks that are compressed concurrently on a process pool. Each chunk
+becomes a raw deflate stream ending on a byte boundary (sync flush), so the
+chunks of a file can simply be concatenated into one zip entry. The chunks are
+written in order while only a bounded window of them is in flight, so memory
+use does not depend on the input size.
+
+Examples:
+    python parallel_zip.py mydata.txt
+    python parallel_zip.py --workers 8 --chunk-mb 4 -o big.zip /data/*.bin
+    python parallel_zip.py --scaling /data/*.bin
+"""
+
+import argparse
+import collections
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from concurrent import futures
+
+CHUNK_SIZE = 4 << 20  # bytes of input per compression task
+DICT_SIZE = 32 << 10  # deflate window: tail of the previous chunk primes the next
+ZIP64_LIMIT = (1 << 31) - 1  # larger sizes and offsets need zip64 records
+
+
+# --- CRC-32 of concatenated chunks (zlib's crc32_combine) ---
+
+_CRC_POLY = 0xedb88320
+
+
+def _multmodp(a, b):
+    # a * b modulo the CRC polynomial (bit-reflected)
+    m = 1 << 31
+    p = 0
+    while True:
+        if a & m:
+            p ^= b
+            if (a & (m - 1)) == 0:
+                return p
+        m >>= 1
+        b = (b >> 1) ^ _CRC_POLY if b & 1 else b >> 1
+
+
+_X2N = [1 << 30]  # x^(2^k) modulo the polynomial
+for _ in range(31):
+    _X2N.append(_multmodp(_X2N[-1], _X2N[-1]))
+
+
+def crc32_combine(crc1, crc2, len2):
+    """CRC of A + B from the CRCs of A and B and the length of B."""
+    p = 1 << 31  # x^0
+    n, k = len2, 3  # multiply with x^(8 * len2)
+    while n:
+        if n & 1:
+            p = _multmodp(_X2N[k & 31], p)
+        n >>= 1
+        k += 1
+    return _multmodp(p, crc1) ^ crc2
+
+
+# --- compression task, runs in a pool process ---
+
+def compress_chunk(path, offset, size, last, level):
+    """Compress one region of a file, return (deflate data, crc, size)."""
+    with open(path, 'rb') as f:
+        start = max(0, offset - DICT_SIZE)
+        f.seek(start)
+        zdict = f.read(offset - start)
+        data = f.read(size)
+    if zdict:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=zdict)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    # all but the last chunk end on a byte boundary without closing the stream
+    out = compressor.compress(data) + compressor.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+    return out, zlib.crc32(data), len(data)
+
+
+# --- zip format ---
+
+def _dos_time(mtime):
+    t = time.localtime(mtime)
+    if t.tm_year < 1980:
+        return 0, (1 << 5) | 1  # 1980-01-01
+    return ((t.tm_hour << 11) | (t.tm_min << 5) | (t.tm_sec // 2),
+            ((t.tm_year - 1980) << 9) | (t.tm_mon << 5) | t.tm_mday)
+
+
+class Entry:
+    """Archive member, filled in while its chunks are written."""
+
+    def __init__(self, path, arcname):
+        stat = os.stat(path)
+        self.path = path
+        self.name = arcname.encode('utf-8')
+        self.flags = 0 if arcname.isascii() else 0x800  # utf-8 name
+        self.mode = stat.st_mode
+        self.time, self.date = _dos_time(stat.st_mtime)
+        self.file_size = stat.st_size
+        self.zip64 = self.file_size * 1.05 > ZIP64_LIMIT  # compressed size may exceed the input
+        self.offset = 0
+        self.crc = 0
+        self.compress_size = 0
+        self.done = 0  # input bytes written so far
+        self.started = 0.0
+
+    def local_header(self):
+        if self.zip64:
+            sizes = (0xffffffff, 0xffffffff)
+            extra = struct.pack('<HHQQ', 1, 16, self.file_size, self.compress_size)
+        else:
+            sizes = (self.compress_size, self.file_size)
+            extra = b''
+        return struct.pack('<IHHHHHIIIHH', 0x04034b50, 45 if self.zip64 else 20, self.flags, 8,
+                           self.time, self.date, self.crc, *sizes, len(self.name), len(extra)) \
+            + self.name + extra
+
+    def central_header(self):
+        fields = []  # zip64 extra holds the values that do not fit
+        file_size, compress_size, offset = self.file_size, self.compress_size, self.offset
+        if file_size > ZIP64_LIMIT:
+            fields.append(file_size)
+            file_size = 0xffffffff
+        if compress_size > ZIP64_LIMIT:
+            fields.append(compress_size)
+            compress_size = 0xffffffff
+        if offset > ZIP64_LIMIT:
+            fields.append(offset)
+            offset = 0xffffffff
+        extra = struct.pack('<HH' + 'Q' * len(fields), 1, 8 * len(fields), *fields) if fields else b''
+        version = 45 if fields or self.zip64 else 20
+        return struct.pack('<IHHHHHHIIIHHHHHII', 0x02014b50, (3 << 8) | version, version, self.flags, 8,
+                           self.time, self.date, self.crc, compress_size, file_size,
+                           len(self.name), len(extra), 0, 0, 0, (self.mode & 0xffff) << 16, offset) \
+            + self.name + extra
+
+
+def _end_records(count, cd_offset, cd_size):
+    records = b''
+    if count > 0xffff or cd_offset > ZIP64_LIMIT or cd_size > ZIP64_LIMIT:
+        end64 = cd_offset + cd_size
+        records += struct.pack('<IQHHIIQQQQ', 0x06064b50, 44, 45, 45, 0, 0, count, count, cd_size, cd_offset)
+        records += struct.pack('<IIQI', 0x07064b50, 0, end64, 1)
+        count, cd_offset, cd_size = min(count, 0xffff), min(cd_offset, 0xffffffff), min(cd_size, 0xffffffff)
+    return records + struct.pack('<IHHHHIIH', 0x06054b50, 0, 0, count, count, cd_size, cd_offset, 0)
+
+
+# --- archiver ---
+
+class ParallelZip(threading.Thread):
+    """
+    Background thread writing a zip archive of infiles, compressed by a process pool.
+    progress is called with (entry, seconds) after each completed file.
+    """
+
+    def __init__(self, infiles, outfile, workers=None, chunk_size=CHUNK_SIZE, level=6, progress=None):
+        threading.Thread.__init__(self)
+        self.infiles = list(infiles)
+        self.outfile = outfile
+        self.workers = workers or os.cpu_count()
+        self.chunk_size = chunk_size
+        self.level = level
+        self.window = 2 * self.workers  # chunks in flight: bounds memory, keeps all workers busy
+        self.progress = progress
+        self.entries = []
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+
+    def _chunks(self, entries):
+        # (entry, offset, size, last) over all files, at least one chunk per file
+        for entry in entries:
+            offset = 0
+            while True:
+                size = min(self.chunk_size, entry.file_size - offset)
+                last = offset + size >= entry.file_size
+                yield entry, offset, size, last
+                offset += size
+                if last:
+                    break
+
+    def run(self):
+        start = time.perf_counter()
+        self.entries = [Entry(path, os.path.basename(path)) for path in self.infiles]
+        with open(self.outfile, 'wb') as out, futures.ProcessPoolExecutor(self.workers) as pool:
+            in_flight = collections.deque()
+            for task in self._chunks(self.entries):
+                if len(in_flight) >= self.window:
+                    self._write(out, *in_flight.popleft())
+                entry, offset, size, last = task
+                in_flight.append((task, pool.submit(compress_chunk, entry.path, offset, size, last, self.level)))
+            while in_flight:
+                self._write(out, *in_flight.popleft())
+
+            cd_offset = out.tell()
+            for entry in self.entries:
+                out.write(entry.central_header())
+            out.write(_end_records(len(self.entries), cd_offset, out.tell() - cd_offset))
+            self.bytes_out = out.tell()
+        self.seconds = time.perf_counter() - start
+
+    def _write(self, out, task, future):
+        # append the next chunk in order, finish its entry after the last one
+        entry, offset, _, last = task
+        data, crc, size = future.result()
+        if offset == 0:
+            entry.started = time.perf_counter()
+            entry.offset = out.tell()
+            out.write(entry.local_header())  # rewritten once crc and sizes are known
+        out.write(data)
+        entry.crc = crc32_combine(entry.crc, crc, size) if offset else crc
+        entry.compress_size += len(data)
+        entry.done += size
+        self.bytes_in += size
+        if last:
+            end = out.tell()
+            out.seek(entry.offset)
+            out.write(entry.local_header())
+            out.seek(end)
+            if self.progress is not None:
+                self.progress(entry, time.perf_counter() - entry.started)
+
+    def report(self):
+        return {
+            'files': len(self.entries),
+            'bytes_in': self.bytes_in,
+            'bytes_out': self.bytes_out,
+            'ratio': round(self.bytes_out / self.bytes_in, 3) if self.bytes_in else None,
+            'seconds': round(self.seconds, 3),
+            'throughput_MBps': round(self.bytes_in / self.seconds / 1e6, 1) if self.seconds else None,
+            'workers': self.workers,
+        }
+
+
+def print_progress(entry, seconds):
+    rate = entry.file_size / seconds / 1e6 if seconds else 0.0
+    print('{}: {} -> {} bytes, {:.1f} MB/s'.format(entry.name.decode('utf-8'), entry.file_size,
+                                                    entry.compress_size, rate))
+
+
+def scaling(infiles, chunk_size, level):
+    """Archive the input with 1, 2, 4, ... workers up to the core count and print the speedup."""
+    counts = sorted({1 << k for k in range(os.cpu_count().bit_length()) if 1 << k <= os.cpu_count()}
+                    | {os.cpu_count()})
+    base = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in counts:
+            archiver = ParallelZip(infiles, os.path.join(tmp, 'scaling.zip'), workers, chunk_size, level)
+            archiver.start()
+            archiver.join()
+            base = base or archiver.seconds
+            print('{:3d} workers: {:8.3f} s  {:8.1f} MB/s  speedup {:.2f}'.format(
+                workers, archiver.seconds, archiver.bytes_in / archiver.seconds / 1e6, base / archiver.seconds))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Zip files, compressing chunks in parallel')
+    parser.add_argument('infiles', nargs='+')
+    parser.add_argument('-o', '--output', default='myarchive.zip')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='compression processes')
+    parser.add_argument('--chunk-mb', type=float, default=CHUNK_SIZE / (1 << 20), help='chunk size in MiB')
+    parser.add_argument('--level', type=int, default=6, help='deflate level 1-9')
+    parser.add_argument('--scaling', action='store_true', help='compare 1 .. cpu_count workers')
+    args = parser.parse_args()
+    chunk_size = int(args.chunk_mb * (1 << 20))
+
+    if args.scaling:
+        scaling(args.infiles, chunk_size, args.level)
+        return
+    background = ParallelZip(args.infiles, args.output, args.workers, chunk_size, args.level,
+                             progress=print_progress)
+    background.start()
+    print('The main program continues to run in foreground.')
+    background.join()  # Wait for the background task to finish
+    print('Finished background zip:', background.report())
+
+
+if __name__ == '__main__':
+    main()
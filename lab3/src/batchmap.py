@@ -0,0 +1,35 @@
+import collections
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+VECTOR_MIN = 256  # ab so vielen verschiedenen Wörtern wird mit NumPy partitioniert
+
+
+def map_batch(text, ring):
+    """
+    Map-Phase für einen ganzen Block von Zeilen auf einmal: zerlegt den Text in Wörter,
+    zählt sie und teilt die Anzahlen nach dem Hash-Ring auf die Reducer auf.
+    Zerlegen (str.split) und Zählen (Counter) laufen in C, ohne Python-Schleife pro Wort;
+    partitioniert wird nur noch pro verschiedenem Wort, mit NumPy vektorisiert.
+    Gibt (ein dict Wort -> Anzahl pro Reducer, Anzahl aller Wörter) zurück.
+    """
+    words = text.split()
+    counts = collections.Counter(words)
+    if np is None or len(counts) < VECTOR_MIN:
+        parts = [{} for _ in ring.nodes]
+        for word, count in counts.items():
+            parts[ring.node_index(word)][word] = count
+        return parts, len(words)
+
+    distinct = np.array(list(counts), dtype=object)
+    totals = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+    owners = ring.node_indices(distinct)
+    # nach Reducer sortieren, dann ist jede Partition ein zusammenhängender Bereich
+    order = np.argsort(owners, kind='stable')
+    bounds = np.searchsorted(owners[order], np.arange(len(ring.nodes) + 1))
+    distinct, totals = distinct[order].tolist(), totals[order].tolist()
+    parts = [dict(zip(distinct[start:end], totals[start:end])) for start, end in zip(bounds, bounds[1:])]
+    return parts, len(words)
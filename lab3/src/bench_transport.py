@@ -0,0 +1,75 @@
+# Vergleich der Transporte tcp, ipc und inproc
+# 1. Nachrichten pro Sekunde zwischen einem PUSH- und einem PULL-Socket (Threads eines Prozesses)
+# 2. optional: der ganze Job über main.py mit jedem Transport (Laufzeit, Wörter/s aus dem Bericht der Sink)
+
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import zmq
+
+import constMR
+from scaling import find_report
+
+TRANSPORTS = ['tcp', 'ipc', 'inproc']
+BENCH_PORT = 5599  # Port des Messaufbaus (über constMR.endpoint auf den Transport abgebildet)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Nachrichten/s und Job-Laufzeit für tcp, ipc und inproc')
+    parser.add_argument('--messages', type=int, default=200000, help='Anzahl Nachrichten pro Messung')
+    parser.add_argument('--size', type=int, default=100, help='Bytes pro Nachricht')
+    parser.add_argument('--job', metavar='FILE', help='zusätzlich main.py --bulk mit dieser Eingabedatei messen')
+    parser.add_argument('--mappers', type=int, default=2, help='Anzahl Mapper für --job')
+    args = parser.parse_args()
+
+    for transport in TRANSPORTS:
+        rate = messages_per_second(transport, args.messages, args.size)
+        print(f"{transport:7s} {rate:12.0f} Nachrichten/s ({rate * args.size / 1e6:.1f} MB/s)")
+
+    if args.job:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        for transport in TRANSPORTS:
+            cmd = [sys.executable, "-u", os.path.join(base_dir, "main.py"), args.job, "--bulk", "--no-autoscale",
+                   "--mappers", str(args.mappers), "--transport", transport]
+            output = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT).stdout.decode('utf-8')
+            report = find_report(output)
+            if report is None:
+                print(f"{transport:7s} Job: kein Bericht der Sink erhalten")
+                continue
+            print(f"{transport:7s} Job: {report['makespan_s']:.2f} s, {report['words_per_s']:.0f} Wörter/s")
+
+
+def messages_per_second(transport, count, size):
+    """Sendet count Nachrichten von einem Thread zum anderen, gibt den Durchsatz zurück."""
+    constMR.TRANSPORT = transport
+    context = zmq.Context()
+    receiver = context.socket(zmq.PULL)
+    receiver.bind(constMR.endpoint(BENCH_PORT, bind=True))
+
+    def send():
+        sender = context.socket(zmq.PUSH)
+        sender.connect(constMR.endpoint(BENCH_PORT))
+        payload = b'x' * size
+        for _ in range(count):
+            sender.send(payload)
+        sender.close(linger=-1)
+
+    thread = threading.Thread(target=send)
+    thread.start()
+    receiver.recv()  # erste Nachricht: Verbindung steht, ab hier messen
+    start = time.perf_counter()
+    for _ in range(count - 1):
+        receiver.recv()
+    seconds = time.perf_counter() - start
+    thread.join()
+    receiver.close()
+    context.term()
+    return (count - 1) / seconds
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import os
+import tempfile
+
+# Adressen der Pipeline
+HOST = "localhost"
+# Transport: tcp (Standard), ipc (Unix-Sockets, nur ein Rechner) oder inproc (alle Stufen als
+# Threads in einem Prozess mit einem gemeinsamen zmq.Context, siehe main.py --transport)
+TRANSPORT = os.environ.get('MAPREDUCE_TRANSPORT', 'tcp')
+IPC_DIR = tempfile.gettempdir()
+SPLITTER_PORT = 5557
+REDUCER_BASE_PORT = 5558  # Reducer i bindet an REDUCER_BASE_PORT + i - 1
+
+# Combiner im Mapper: Wortanzahlen werden gesammelt und gebündelt gesendet,
+# sobald BATCH_WORDS Wörter gezählt wurden oder FLUSH_INTERVAL Sekunden vergangen sind
+BATCH_WORDS = 10000
+FLUSH_INTERVAL = 0.5
+
+# Handshake: Reducer und Mapper melden sich per REQ beim Kontroll-Socket (ROUTER)
+# des Splitters. Die Mapper erhalten als Antwort die Endpunkte aller Reducer.
+CONTROL_PORT = 5556
+READY_TIMEOUT = 10  # Sekunden, die der Splitter höchstens auf alle Reducer wartet
+
+# Bulk-Modus des Splitters: Zeilen werden zu Nachrichten von höchstens TASK_BYTES gebündelt
+TASK_BYTES = 256 * 1024
+# Mapper fordern Aufgaben an: höchstens so viele Aufgaben sind pro Mapper unterwegs
+TASK_CREDITS = 4
+# Reducer geben Credits an die Mapper zurück: höchstens so viele Batches eines Mappers
+# warten bei einem Reducer (Speicher der Reducer-Warteschlange: Mapper * REDUCER_CREDITS Batches)
+REDUCER_CREDITS = 8
+RETIRE_TIMEOUT = 5  # Sekunden, die ein abgemeldeter Mapper höchstens auf den Stopp-Frame wartet
+STATUS_INTERVAL = 1  # Sekunden zwischen zwei Statuszeilen der Mapper (für main.py)
+# Nachzügler: die Mapper bestätigen ihre Aufgaben. Unbestätigte Aufgaben erhält nach
+# SPECULATE_FACTOR mal der mittleren Dauer (mindestens SPECULATE_MIN_S Sekunden) ein anderer Mapper
+SPECULATE_FACTOR = 3
+SPECULATE_MIN_S = 2.0
+TASK_TIMEOUT = 10  # Sekunden, solange noch keine Dauer gemessen wurde
+SLOW_DELAY = 1.0  # Sekunden Verzögerung pro Aufgabe eines absichtlich langsamen Mappers (main.py --slow-mapper)
+
+# Sink: sammelt die Ergebnisse der Reducer und misst die Laufzeit des Jobs
+SINK_PORT = 5555
+RESULT_CHUNK = 10000  # (Wort, Anzahl)-Paare pro Ergebnisnachricht eines Reducers
+RESULT_FILE = "result.txt"
+
+# Live-Abfragen: Reducer i beantwortet count(wort) und topk(k) auf QUERY_BASE_PORT + i - 1
+QUERY_BASE_PORT = 5568
+TOPK_TRACKED = 1000  # so viele Top-Schlüssel verfolgt jeder Reducer (größtes k)
+QUERY_TIMEOUT = 2  # Sekunden, die query.py höchstens auf einen Reducer wartet
+
+# Reducer: höchstens so viele Wörter im Speicher, dann sortierter Run auf die Platte (None: unbegrenzt)
+MAX_KEYS = None
+
+# Autoskalierung der Mapper in main.py: alle SCALE_INTERVAL Sekunden wird die mittlere
+# Auslastung (beschäftigte Zeit / Zeit) der Mapper geprüft
+SCALE_INTERVAL = 2
+SCALE_UP_UTIL = 0.8  # darüber einen Mapper hinzufügen
+SCALE_DOWN_UTIL = 0.3  # darunter einen Mapper abmelden
+
+
+def endpoint(port, bind=False):
+    """Adresse des Sockets zu einem Port der Pipeline für den gewählten Transport."""
+    if TRANSPORT == 'ipc':
+        return f"ipc://{IPC_DIR}/mapreduce-{port}"
+    if TRANSPORT == 'inproc':
+        return f"inproc://mapreduce-{port}"
+    return f"tcp://*:{port}" if bind else f"tcp://{HOST}:{port}"
@@ -0,0 +1,52 @@
+import bisect
+import zlib
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class HashRing:
+    """
+    Konsistentes Hashing: jeder Knoten (Reducer-Endpunkt) liegt mit vielen
+    virtuellen Punkten auf einem Ring von 32-Bit-Hashwerten. Ein Schlüssel gehört
+    zum nächsten Punkt im Uhrzeigersinn. Kommt ein Reducer hinzu, wechselt nur
+    etwa 1/N der Schlüssel den Reducer.
+    crc32 statt hash(), weil hash() in jedem Prozess anders ist.
+    """
+
+    def __init__(self, nodes, vnodes=100, cache_size=1 << 20):
+        self.nodes = list(nodes)
+        points = sorted((zlib.crc32(f"{node}#{i}".encode('utf-8')), index)
+                        for index, node in enumerate(self.nodes) for i in range(vnodes))
+        self.hashes = [h for h, _ in points]
+        self.owners = [index for _, index in points]
+        if np is not None:  # für node_indices()
+            self.hash_array = np.array(self.hashes, dtype=np.uint32)
+            self.owner_array = np.array(self.owners, dtype=np.intp)
+        # Wörter wiederholen sich: Zuordnung merken (begrenzt)
+        self.cache = {}
+        self.cache_size = cache_size
+
+    def node_index(self, key):
+        """Index des Knotens, zu dem der Schlüssel gehört."""
+        index = self.cache.get(key)
+        if index is None:
+            h = zlib.crc32(key.encode('utf-8'))
+            index = self.owners[bisect.bisect(self.hashes, h) % len(self.hashes)]
+            if len(self.cache) >= self.cache_size:
+                self.cache.clear()
+            self.cache[key] = index
+        return index
+
+    def node(self, key):
+        return self.nodes[self.node_index(key)]
+
+    def node_indices(self, keys):
+        """
+        Knotenindizes vieler Schlüssel auf einmal (NumPy-Array).
+        Die Suche auf dem Ring läuft vektorisiert, nur crc32 wird pro Schlüssel aufgerufen.
+        """
+        hashes = np.fromiter((zlib.crc32(key.encode('utf-8')) for key in keys), dtype=np.uint32, count=len(keys))
+        return self.owner_array[np.searchsorted(self.hash_array, hashes, side='right') % len(self.hashes)]
@@ -0,0 +1,182 @@
+import re
+
+from batchmap import map_batch
+
+
+class Job:
+    """
+    Ein MapReduce-Job. Unterklassen liefern map() und reduce(), optional combine()
+    und partition(). Die Pipeline (Splitter, Mapper, Reducer, Sink) übernimmt die
+    Verteilung, Serialisierung, Batches und das Zusammenführen der Ergebnisse.
+    Schlüssel sind Zeichenketten ohne Tabs und Zeilenumbrüche, Werte müssen sich mit
+    pickle serialisieren lassen.
+
+    Zwischen Mapper und Reducer wandert pro Schlüssel ein Teilwert: mit Combiner der
+    bereits zusammengefasste Wert, ohne Combiner die Liste der Werte.
+    """
+
+    argument = None  # Name des Arguments in --job name:argument, None: Job ohne Argument
+    combine = None  # optional: combine(key, values) -> Wert, assoziativ (im Mapper und im Reducer angewendet)
+    score = None  # optional: score(partial) -> Zahl, additiv und nie negativ (für topk-Abfragen an die Reducer)
+
+    def map(self, location, line):
+        """(Schlüssel, Wert)-Paare einer Eingabezeile. location ist 'Aufgabe:Zeile'."""
+        raise NotImplementedError
+
+    def reduce(self, key, values):
+        """Endergebnis eines Schlüssels aus all seinen (ggf. kombinierten) Werten."""
+        raise NotImplementedError
+
+    def partition(self, key, ring):
+        """Index des Reducers, der den Schlüssel erhält."""
+        return ring.node_index(key)
+
+    def format(self, key, value):
+        """Zeile der Ergebnisdatei (beginnt mit dem Schlüssel, danach ein Tab)."""
+        return f"{key}\t{value}"
+
+    def map_block(self, task_id, text, ring):
+        """
+        Map-Phase einer ganzen Aufgabe. Gibt (pro Reducer ein dict Schlüssel -> Teilwert,
+        Anzahl der Paare) zurück.
+        """
+        parts = [{} for _ in ring.nodes]
+        records = 0
+        for number, line in enumerate(text.splitlines()):
+            for key, value in self.map(f"{task_id}:{number}", line):
+                parts[self.partition(key, ring)].setdefault(key, []).append(value)
+                records += 1
+        if self.combine is not None:
+            parts = [{key: self.combine(key, values) for key, values in part.items()} for part in parts]
+        return parts, records
+
+    def merge_partials(self, key, partials):
+        """Fasst Teilwerte eines Schlüssels aus verschiedenen Batches (oder Runs) zusammen."""
+        if self.combine is not None:
+            return self.combine(key, partials)
+        return [value for partial in partials for value in partial]
+
+    def merge(self, target, part):
+        """Addiert die Teilwerte eines Batches (dict) in target."""
+        for key, partial in part.items():
+            if key not in target:
+                target[key] = partial
+            elif self.combine is not None:
+                target[key] = self.combine(key, [target[key], partial])
+            else:
+                target[key].extend(partial)  # Wertelisten an Ort und Stelle verlängern, nicht kopieren
+
+    def finish(self, key, partial):
+        """Endergebnis eines Schlüssels aus seinem letzten Teilwert."""
+        return self.reduce(key, [partial] if self.combine is not None else partial)
+
+    def records(self, part):
+        """Anzahl der Paare in einem Batch, für die Statistik (mit Combiner: Anzahl Schlüssel)."""
+        if self.combine is not None:
+            return len(part)
+        return sum(len(values) for values in part.values())
+
+
+class WordCount(Job):
+    """Zählt die Wörter (Standard-Job). Map und Partitionierung laufen vektorisiert über map_batch()."""
+
+    def map(self, location, line):
+        return ((word, 1) for word in line.split())
+
+    def combine(self, key, values):
+        return sum(values)
+
+    def reduce(self, key, values):
+        return sum(values)
+
+    def map_block(self, task_id, text, ring):
+        return map_batch(text, ring)
+
+    def merge(self, target, part):
+        for key, count in part.items():
+            target[key] = target.get(key, 0) + count
+
+    def records(self, part):
+        return sum(part.values())
+
+    def score(self, partial):
+        return partial
+
+
+class InvertedIndex(Job):
+    """
+    Wort -> sortierte Liste der Fundstellen ('Aufgabe:Zeile').
+    Ohne Combiner: die Fundstellen werden nur aneinandergehängt und erst im
+    reduce() einmal sortiert, statt bei jedem Zusammenführen neu.
+    """
+
+    def map(self, location, line):
+        return ((word, location) for word in set(line.split()))
+
+    def reduce(self, key, values):
+        return " ".join(sorted(set(values)))
+
+
+class Grep(Job):
+    """Zeilen, die den regulären Ausdruck enthalten, nach Fundstelle."""
+
+    argument = 'muster'
+
+    def __init__(self, pattern):
+        try:
+            self.pattern = re.compile(pattern)
+        except re.error as e:
+            raise ValueError(f"ungültiger regulärer Ausdruck {pattern!r}: {e}") from e
+
+    def map(self, location, line):
+        if self.pattern.search(line):
+            yield location, line
+
+    def reduce(self, key, values):
+        return values[0]
+
+
+class SumByKey(Job):
+    """
+    Summe pro Schlüssel für Zeilen der Form 'Schlüssel Zahl'. Andere Zeilen
+    (mehr oder weniger Felder, keine Zahl) werden übersprungen.
+    """
+
+    def map(self, location, line):
+        fields = line.split()
+        if len(fields) == 2:
+            try:
+                value = float(fields[1])
+            except ValueError:
+                return
+            yield fields[0], value
+
+    def combine(self, key, values):
+        return sum(values)
+
+    def reduce(self, key, values):
+        return sum(values)
+
+
+# Jobs, die über --job ausgewählt werden können, z.B. "--job grep:fehler"
+JOBS = {
+    'wordcount': WordCount,
+    'index': InvertedIndex,
+    'grep': Grep,
+    'sum': SumByKey,
+}
+
+
+def make_job(spec):
+    """Erzeugt einen Job aus 'name' oder 'name:argument'."""
+    name, _, argument = spec.partition(':')
+    if name not in JOBS:
+        raise ValueError(f"unbekannter Job {name!r}, möglich: {', '.join(JOBS)}")
+    job_class = JOBS[name]
+    if job_class.argument is None:
+        if argument:
+            raise ValueError(f"Job {name!r} erwartet kein Argument, Aufruf: --job {name}")
+        return job_class()
+    if not argument:
+        raise ValueError(f"Job {name!r} braucht ein Argument, Aufruf: --job {name}:{job_class.argument}")
+    return job_class(argument)
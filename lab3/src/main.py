@@ -1,8 +1,17 @@
+import argparse
 import subprocess
 import sys
-import time
 import os
 import threading
+import time
+
+import zmq
+
+import constMR
+import mapper
+import reducer
+import sink
+import splitter
 
 # ANSI color codes for readable output
 COLORS = {
@@ -11,71 +20,239 @@ COLORS = {
     'M3': '\033[92m', # Green
     'R1': '\033[93m', # Yellow
     'R2': '\033[95m', # Magenta
+    'S': '\033[97m', # White
     'RESET': '\033[0m'
 }
 
-def stream_output(process, prefix, color):
+def stream_output(process, prefix, color, on_status=None):
     """
     Reads stdout from a subprocess line-by-line and prints it 
     to the main console with a colored prefix.
+    STATUS lines of the mappers are passed to on_status instead of being printed.
     """
     for line in iter(process.stdout.readline, b''):
         try:
             # Decode bytes to string and strip trailing whitespace
             msg = line.decode('utf-8').rstrip()
-            if msg:
+            if on_status and msg.startswith("STATUS "):
+                on_status(msg)
+            elif msg:
                 print(f"{color}[{prefix}] {msg}{COLORS['RESET']}")
         except ValueError:
             break
 
+def available_cores():
+    """Number of cores this process may run on."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not on Linux
+        return os.cpu_count() or 1
+
+
+class MapperPool:
+    """
+    The mapper processes of a job. Each mapper reports its counters in a STATUS line
+    every STATUS_INTERVAL seconds. From the difference between two checks the pool
+    derives per-mapper utilization (busy time / wall time) and throughput (words/s).
+    A mapper's backlog is bounded by its TASK_CREDITS, so a busy mapper is one that
+    always has work waiting: if the mappers are busy on average the pool adds one,
+    if they mostly wait for the splitter it retires one (SIGTERM, the mapper finishes
+    its tasks and unregisters).
+    """
+
+    def __init__(self, launch, minimum, maximum):
+        self.launch = launch  # launch(label) -> Popen, with on_status wired to report()
+        self.minimum = minimum
+        self.maximum = maximum
+        self.mappers = {}  # label -> Popen
+        self.status = {}  # label -> (time, words, busy_s) of the last STATUS line
+        self.checked = {}  # label -> status at the last check
+        self.started = 0
+
+    def add(self):
+        self.started += 1
+        label = f"Mapper {self.started}"
+        self.mappers[label] = self.launch(label)
+        return label
+
+    def retire(self, label):
+        self.mappers[label].terminate()  # SIGTERM: unregister, finish the last tasks
+        print(f"[Scaler] Retiring {label}")
+        del self.mappers[label]
+        self.checked.pop(label, None)
+
+    def report(self, label, msg):
+        # "STATUS tasks=.. words=.. busy_s=.."
+        values = dict(field.split('=') for field in msg.split()[1:])
+        self.status[label] = (time.monotonic(), int(values['words']), float(values['busy_s']))
+
+    def check(self, autoscale):
+        """Measure utilization and throughput since the last check, then add or retire a mapper."""
+        for label in [label for label, p in self.mappers.items() if p.poll() is not None]:
+            del self.mappers[label]  # exited on its own
+        utilization = {}
+        rate = 0.0
+        for label in self.mappers:
+            now = self.status.get(label)
+            before = self.checked.get(label)
+            if now and before and now[0] > before[0]:
+                utilization[label] = (now[2] - before[2]) / (now[0] - before[0])
+                rate += (now[1] - before[1]) / (now[0] - before[0])
+            if now:
+                self.checked[label] = now
+        if not utilization:  # no mapper has reported twice yet
+            return
+        mean = sum(utilization.values()) / len(utilization)
+        print(f"[Scaler] {len(self.mappers)} mappers, utilization {mean:.0%}, {rate:.0f} words/s")
+        if not autoscale:
+            return
+        if mean > constMR.SCALE_UP_UTIL and len(self.mappers) < self.maximum:
+            print(f"[Scaler] Adding {self.add()}")
+        elif mean < constMR.SCALE_DOWN_UTIL and len(self.mappers) > self.minimum:
+            self.retire(min(utilization, key=utilization.get))  # the least busy one
+
+
+def run_threads(mappers, sink_args, reducer_args, splitter_args):
+    """
+    Runs all stages as threads of this process. They share one zmq.Context and talk
+    over inproc:// endpoints, so no message crosses the TCP loopback stack.
+    The mappers share the GIL, the pool therefore has a fixed size.
+    """
+    constMR.TRANSPORT = 'inproc'
+    context = zmq.Context()
+    threads = []
+
+    def start(target, argv, **kwargs):
+        t = threading.Thread(target=target, args=(argv, context), kwargs=kwargs, daemon=True)
+        t.start()
+        threads.append(t)
+        return t
+
+    sink_thread = start(sink.main, sink_args)
+    for args in reducer_args:
+        start(reducer.main, args)
+    for args in mappers:
+        start(mapper.main, args, retiring=[])
+    if splitter.main(splitter_args, context):
+        return 1  # the job never started: the other stages wait in vain and end with the process (daemon threads)
+    sink_thread.join()
+    for t in threads:
+        t.join(timeout=constMR.RETIRE_TIMEOUT)
+    if not any(t.is_alive() for t in threads):
+        context.term()
+    return 0
+
+
 def main():
+    parser = argparse.ArgumentParser(description='Startet die MapReduce-Pipeline')
+    parser.add_argument('filename', nargs='?', default='text.txt', help='Eingabedatei für den Splitter')
+    parser.add_argument('--bulk', action='store_true', help='Splitter im Bulk-Modus (ungebremst)')
+    parser.add_argument('--job', default='wordcount', help='MapReduce-Job, z.B. wordcount, index, grep:fehler, sum')
+    parser.add_argument('--mappers', type=int, help='Anzahl Mapper zu Beginn (Standard: alle Kerne)')
+    parser.add_argument('--min-mappers', type=int, default=1, help='Autoskalierung: mindestens so viele Mapper')
+    parser.add_argument('--max-mappers', type=int, help='Autoskalierung: höchstens so viele Mapper (Standard: alle Kerne)')
+    parser.add_argument('--no-autoscale', action='store_true', help='Anzahl der Mapper während des Jobs nicht ändern')
+    parser.add_argument('--reducers', type=int, default=2, help='Anzahl Reducer (Partitionen)')
+    parser.add_argument('--output', default='result.txt', help='Ergebnisdatei der Sink')
+    parser.add_argument('--slow-mapper', action='store_true',
+                        help='Mapper 1 absichtlich verlangsamen (Test der Nachzügler-Behandlung)')
+    parser.add_argument('--max-keys', type=int, help='Speichergrenze der Reducer (Wörter), darüber auslagern')
+    parser.add_argument('--transport', choices=['tcp', 'ipc', 'inproc'], default='tcp',
+                        help='tcp: Prozesse über localhost, ipc: Prozesse über Unix-Sockets, '
+                             'inproc: alle Stufen als Threads eines Prozesses')
+    args = parser.parse_args()
+    cores = available_cores()
+    max_mappers = args.max_mappers or cores
+    mappers = args.mappers or min(cores, max_mappers)
+
+    sink_args = ["--reducers", str(args.reducers), "--output", args.output]
+    reducer_args = [[str(i)] + (["--max-keys", str(args.max_keys)] if args.max_keys else [])
+                    for i in range(1, args.reducers + 1)]
+    splitter_args = [args.filename, "--reducers", str(args.reducers), "--job", args.job]
+    if args.bulk:
+        splitter_args.append("--bulk")
+
+    def mapper_args(number):
+        delay = ["--delay", str(constMR.SLOW_DELAY)] if args.slow_mapper and number == 1 else []
+        return ["--id", str(number)] + delay
+
+    if args.transport == 'inproc':
+        print(f"--- Running MapReduce pipeline in-process ({mappers} mapper threads) ---")
+        return run_threads([mapper_args(i) for i in range(1, mappers + 1)], sink_args, reducer_args, splitter_args)
+    os.environ['MAPREDUCE_TRANSPORT'] = args.transport  # inherited by all processes
+
     base_dir = os.path.dirname(os.path.abspath(__file__))
     processes = []
+    returncode = 1
     
     print("--- Initializing MapReduce Cluster ---")
 
     # Helper to launch a process and start a thread to monitor its output
-    def launch_node(script_name, label, args=[], color_key='RESET'):
+    def launch_node(script_name, label, args=[], color_key='RESET', on_status=None):
         cmd = [sys.executable, "-u", os.path.join(base_dir, script_name)] + args
         # We pipe stdout so we can intercept and tag it. 
         # We use "-u" for unbuffered python output to see prints immediately.
         p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
         
         # Start a thread to read the output continuously
-        t = threading.Thread(target=stream_output, args=(p, label, COLORS[color_key]))
+        t = threading.Thread(target=stream_output, args=(p, label, COLORS[color_key], on_status))
         t.daemon = True # Thread dies if main dies
         t.start()
         
         processes.append(p)
         print(f"Started {label}")
+        return p, t
 
     try:
-        # 1. Start Reducers (Listeners)
-        # They take an ID argument ("1" or "2")
-        launch_node("reducer.py", "Reducer 1", ["1"], 'R1')
-        launch_node("reducer.py", "Reducer 2", ["2"], 'R2')
+        # 0. Start Sink (collects the final result and measures the job)
+        sink_process, sink_output = launch_node("sink.py", "Sink", sink_args, 'S')
 
-        time.sleep(0.5) # Allow bind
+        # 1. Start Reducers (Listeners)
+        # They take an ID argument (1 .. n) that selects their port
+        for i, node_args in enumerate(reducer_args, 1):
+            launch_node("reducer.py", f"Reducer {i}", node_args, f"R{(i - 1) % 2 + 1}")
 
         # 2. Start Mappers (Workers)
-        # Mappers don't take arguments in your current code, 
-        # but we track them logically here as 1, 2, 3
-        launch_node("mapper.py", "Mapper 1", [], 'M1')
-        launch_node("mapper.py", "Mapper 2", [], 'M2')
-        launch_node("mapper.py", "Mapper 3", [], 'M3')
+        # Mappers learn the job and the reducer endpoints from the splitter,
+        # we only number them 1, 2, 3, ... (for their statistics)
+        # They request their tasks, so the pool can grow and shrink while the job runs.
+        def launch_mapper(label):
+            number = int(label.split()[1])
+            p, _ = launch_node("mapper.py", label, mapper_args(number), f"M{(number - 1) % 3 + 1}",
+                               lambda msg: pool.report(label, msg))
+            return p
 
-        time.sleep(0.5) # Allow connect
+        pool = MapperPool(launch_mapper, min(args.min_mappers, mappers), max(max_mappers, mappers))
+        print(f"[System] {cores} cores, starting {mappers} mappers"
+              + ("" if args.no_autoscale else f" (autoscaling {pool.minimum}..{pool.maximum})"))
+        for _ in range(mappers):
+            pool.add()
 
         # 3. Start Splitter (The Driver)
-        # We run this in the foreground (no piping) so you can hit Enter.
+        # It waits until all reducers registered, then sends the input to the mappers.
         print("--------------------------------------")
         print("[System] Launching Splitter (Foreground)...")
-        print("[System] Please interact with the Splitter prompt below:")
         print("--------------------------------------")
         
-        # MODIFICATION: Add "text.txt" to the splitter_cmd list
-        splitter_cmd = [sys.executable, "-u", os.path.join(base_dir, "splitter.py"), "text.txt"]
-        subprocess.run(splitter_cmd)
+        splitter_cmd = [sys.executable, "-u", os.path.join(base_dir, "splitter.py")] + splitter_args
+        splitter_process = subprocess.Popen(splitter_cmd)
+
+        # Watch the mappers while the splitter sends, and resize the pool
+        while splitter_process.poll() is None:
+            try:
+                splitter_process.wait(timeout=constMR.SCALE_INTERVAL)
+            except subprocess.TimeoutExpired:
+                pool.check(not args.no_autoscale)
+
+        # 4. The job ends when the sink has all partitions.
+        # If the splitter failed (no input, unknown job, no reducer) the job never ran
+        # and the sink would wait forever: it is terminated below with the others.
+        returncode = splitter_process.returncode
+        if returncode == 0:
+            sink_process.wait()
+            sink_output.join()  # print the sink's report completely
+        else:
+            print(f"[System] Splitter failed (exit code {returncode}), stopping the job.")
 
     except KeyboardInterrupt:
         print("\n[System] Interrupted by user.")
@@ -84,7 +261,13 @@ def main():
         print("\n--- Shutting down Cluster processes ---")
         for p in processes:
             p.terminate()
+        for p in processes:
+            try:
+                p.wait(timeout=constMR.RETIRE_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                p.kill()  # e.g. a mapper still waiting for its handshake
         print("[System] Done.")
+    return returncode
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -1,56 +1,167 @@
+import argparse
+import os
+import pickle
+import signal
+import time
+
 import zmq
-import zlib
 
-def main():
-    context = zmq.Context()
+import constMR
+from hashring import HashRing
+from job import make_job
+
+
+def main(argv=None, context=None, retiring=None):
+    """
+    Startet den Mapper. Als Thread (main.py --transport inproc) übergibt der Aufrufer
+    den gemeinsamen Context und eine Liste retiring, die das Abmelden auslöst.
+    """
+    parser = argparse.ArgumentParser(description='Mapper der MapReduce-Pipeline')
+    parser.add_argument('--delay', type=float, default=0.0,
+                        help='künstliche Verzögerung pro Aufgabe in Sekunden (Test der Nachzügler-Behandlung)')
+    parser.add_argument('--id', help='Name des Mappers in der Statistik (Standard: Prozess-ID)')
+    args = parser.parse_args(argv)
+
+    own_context = context is None
+    if own_context:
+        context = zmq.Context()
 
-    # 1. Input: PULL-Socket zum Empfangen  der Aufgaben (Sätze) vom Splitter
-    receiver = context.socket(zmq.PULL)
-    receiver.connect("tcp://localhost:5557")  # Verbindung zum Splitter
+    if retiring is None:
+        # SIGTERM (von main.py beim Verkleinern des Mapper-Pools): sauber abmelden, nichts verlieren
+        retiring = []
+        signal.signal(signal.SIGTERM, lambda signum, frame: retiring.append(True))
 
-    # 2. Output: ZWEI PUSH-Sockets zu den Reducern
-    # Wir brauchen zwei separate Sockets, um gezielt (und nicht zufällig) zu senden.
-    sender_reducer1 = context.socket(zmq.PUSH)
-    sender_reducer1.connect("tcp://localhost:5558")
+    # 1. Handshake: beim Splitter bereit melden.
+    # Die Antwort enthält die Endpunkte aller Reducer und den Job.
+    control = context.socket(zmq.REQ)
+    control.connect(constMR.endpoint(constMR.CONTROL_PORT))
+    control.send(pickle.dumps(('mapper',)))
+    config = pickle.loads(control.recv())
+    control.close()
+    job = make_job(config['job'])
 
-    sender_reducer2 = context.socket(zmq.PUSH)
-    sender_reducer2.connect("tcp://localhost:5559")
+    # 2. Input: DEALER-Socket zum Anfordern und Empfangen der Aufgaben (Sätze) vom Splitter.
+    # Wir fordern nur so viele Aufgaben an, wie wir bald bearbeiten (Credits).
+    receiver = context.socket(zmq.DEALER)
+    receiver.connect(constMR.endpoint(constMR.SPLITTER_PORT))  # Verbindung zum Splitter
+    receiver.send(pickle.dumps(('credit', constMR.TASK_CREDITS)))
+
+    # 3. Output: ein DEALER-Socket pro Reducer
+    # Wir brauchen separate Sockets, um gezielt (und nicht zufällig) zu senden.
+    # Jeder Batch kostet einen Credit des Reducers, der Reducer gibt ihn nach dem
+    # Verarbeiten mit ('credit', 1) zurück. Ohne Credit wartet der Mapper und holt
+    # keine neuen Aufgaben, so staut sich nichts vor einem langsamen Reducer.
+    senders = []
+    for endpoint in config['reducers']:
+        sender = context.socket(zmq.DEALER)
+        sender.connect(endpoint)
+        senders.append(sender)
+    credits = [constMR.REDUCER_CREDITS] * len(senders)
+    credit_poller = zmq.Poller()
+    for sender in senders:
+        credit_poller.register(sender, zmq.POLLIN)
+    ring = HashRing(config['reducers'])
+
+    # Statistik an die Sink
+    sink = context.socket(zmq.PUSH)
+    sink.connect(constMR.endpoint(constMR.SINK_PORT))
+    mapper_id = args.id or os.getpid()
 
     print("Mapper gestartet. Warte auf Arbeit...")
 
-    while True:
-        # Empfange einen Satz
-        sentence = receiver.recv_string()
-        print(f"Empfangen: {sentence}")
-
-        # Map-Phase: Satz in Wörter zerlegen
-        words = sentence.split()
-
-        '''
-        # Sende jedes Wort an den entsprechenden Reducer
-        for word in words:
-            if word[0].lower() < 'm':  # Wörter, die mit A-L beginnen, gehen zu Reducer 1
-                sender_reducer1.send_string(word)
-                #print(f"Gesendet an Reducer 1: {word}")
-            else:  # Wörter, die mit M-Z beginnen, gehen zu Reducer 2
-                sender_reducer2.send_string(word)
-                #print(f"Gesendet an Reducer 2: {word}")
-        '''
-        # Geschicktere Partitionierung der Wörter auf die beiden Reducer
-        for word in words:
-            # Partitionierung:
-            # Wir nutzen den Hash des Wortes modulo 2.
-            # Ergebnis 0 -> Reducer 1
-            # Ergebnis 1 -> Reducer 2
+    # Combiner: pro Aufgabe und Reducer (Partition) ein dict (Schlüssel -> Teilwert, beim
+    # Wordcount Wort -> Anzahl). Die Aufgaben bleiben im Batch getrennt, so können die
+    # Reducer doppelt bearbeitete Aufgaben (Kopien für Nachzügler) verwerfen.
+    pending = []  # (Aufgaben-ID, Teilwerte pro Reducer) der noch nicht gesendeten Aufgaben
+    buffered = 0  # gemappte, noch nicht gesendete Paare (beim Wordcount: Wörter)
+    last_flush = time.monotonic()
+    next_status = time.monotonic()
+    stats = {'tasks': 0, 'words': 0, 'messages': 0, 'bytes': 0, 'busy_s': 0.0, 'credit_wait_s': 0.0}
+    stopped = False  # Stopp-Frame erhalten: keine weiteren Aufgaben
+    retire_deadline = None
+
+    while not stopped:
+        if retiring and retire_deadline is None:
+            receiver.send(pickle.dumps(('retire',)))  # keine neuen Aufgaben mehr
+            retire_deadline = time.monotonic() + constMR.RETIRE_TIMEOUT
+            print("Mapper meldet sich ab...")
+        if retire_deadline is not None and time.monotonic() > retire_deadline:
+            stopped = True  # Splitter antwortet nicht mehr (Job zu Ende)
+
+        # Auf einen Satz warten, aber höchstens bis zum nächsten Flush
+        if receiver.poll(int(constMR.FLUSH_INTERVAL * 1000)):
+            # Aufgaben-ID und ein Satz oder (im Bulk-Modus) viele Zeilen auf einmal
+            task_id, data = receiver.recv_multipart()
+            if not task_id:  # Stopp-Frame
+                stopped = True
+                continue
+            started = time.perf_counter()
+            text = data.decode('utf-8')
+
+            # Map-Phase des Jobs für alle Zeilen der Aufgabe auf einmal (beim Wordcount:
+            # Text in Wörter zerlegen, zählen) und Partitionierung über den Hash-Ring.
             # Das garantiert, dass das Wort "hallo" IMMER beim gleichen Reducer landet.
-            target = zlib.crc32(word.encode('utf-8')) % 2
+            parts, records = job.map_block(int(task_id), text, ring)
+            pending.append((int(task_id), parts))
+            buffered += records
+            time.sleep(args.delay)
+            if not retiring:
+                receiver.send(pickle.dumps(('credit', 1)))  # nächste Aufgabe anfordern
+            stats['busy_s'] += time.perf_counter() - started
+
+        # Flush: Batch voll, Zeitfenster abgelaufen oder Ende
+        if buffered >= constMR.BATCH_WORDS or (pending and (stopped or time.monotonic() - last_flush >= constMR.FLUSH_INTERVAL)):
+            # auf einen Credit jedes Reducers warten (Gegendruck)
+            started = time.perf_counter()
+            collect_credits(credit_poller, senders, credits, 0)
+            while min(credits) == 0:
+                collect_credits(credit_poller, senders, credits, 1000)
+            stats['credit_wait_s'] += time.perf_counter() - started
+
+            started = time.perf_counter()
+            task_ids = [task_id for task_id, _ in pending]
+            for index, sender in enumerate(senders):
+                # jeder Reducer erhält alle Aufgaben-IDs, auch ohne Wörter für ihn:
+                # so weiß er am Ende, dass keine Wörter dieser Aufgaben mehr kommen
+                batch = pickle.dumps(('batch', [(task_id, parts[index]) for task_id, parts in pending]))
+                sender.send(batch)
+                credits[index] -= 1
+                stats['messages'] += 1
+                stats['bytes'] += len(batch)
+            receiver.send(pickle.dumps(('done', task_ids)))  # Aufgaben beim Splitter bestätigen
+            stats['tasks'] += len(task_ids)
+            stats['words'] += buffered
+            stats['busy_s'] += time.perf_counter() - started
+            sink.send(pickle.dumps(('mapper', mapper_id, stats)))
+            print(f"Batch gesendet: {buffered} Wörter, gesamt {stats['words']} Wörter in "
+                  f"{stats['messages']} Nachrichten ({stats['bytes']} Bytes)")
+            buffered = 0
+            pending = []
+            last_flush = time.monotonic()
+
+        # Statuszeile für main.py (Durchsatz und Auslastung des Mappers)
+        if time.monotonic() >= next_status:
+            # Warteschlange: gemappte, noch nicht gesendete Aufgaben; Credits: der knappste Reducer
+            print(f"STATUS tasks={stats['tasks']} words={stats['words']} busy_s={stats['busy_s']:.3f} "
+                  f"pending={len(pending)} credits={min(credits)} credit_wait_s={stats['credit_wait_s']:.3f}")
+            next_status = time.monotonic() + constMR.STATUS_INTERVAL
+
+    sink.send(pickle.dumps(('mapper', mapper_id, stats)))
+    print(f"Mapper fertig: {stats['tasks']} Aufgaben, {stats['words']} Wörter")
+    for socket in senders + [sink]:
+        socket.close(linger=-1)  # alle Batches zustellen
+    receiver.close(linger=1000)  # letzte Bestätigungen, falls der Splitter noch wartet
+    if own_context:
+        context.term()
+
+
+def collect_credits(poller, senders, credits, timeout):
+    """Nimmt die Credits entgegen, die Reducer zurückgegeben haben."""
+    for socket, _ in poller.poll(timeout):
+        while socket.poll(0):
+            _, amount = pickle.loads(socket.recv())
+            credits[senders.index(socket)] += amount
 
-            if target == 0:
-                sender_reducer1.send_string(word)
-                #print(f"Gesendet an Reducer 1: {word}")
-            else:
-                sender_reducer2.send_string(word)
-                #print(f"Gesendet an Reducer 2: {word}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,75 @@
+# Live-Abfrage der Reducer
+# Sendet die Abfrage an alle Reducer (Scatter) und führt die Antworten zusammen (Gather):
+#   python query.py count hallo
+#   python query.py topk 10
+#   python query.py stats       (Warteschlange und Stand jedes Reducers)
+
+import argparse
+import heapq
+import itertools
+import operator
+import pickle
+import time
+
+import zmq
+
+import constMR
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Live-Abfrage der Reducer')
+    parser.add_argument('kind', choices=['count', 'topk', 'stats'], help='count WORT, topk K oder stats')
+    parser.add_argument('argument', nargs='?', help='Wort (count) oder Anzahl (topk)')
+    parser.add_argument('--reducers', type=int, default=2, help='Anzahl Reducer')
+    args = parser.parse_args()
+
+    argument = int(args.argument) if args.kind == 'topk' else args.argument
+    context = zmq.Context()
+    replies = scatter(context, args.reducers, (args.kind, argument))
+    context.term()
+
+    if args.kind == 'stats':
+        for reducer_id, reply in sorted(replies.items()):
+            print(f"Reducer {reducer_id}: " + ", ".join(f"{name}={value}" for name, value in reply.items()))
+    elif args.kind == 'count':
+        # nur der Reducer, dem das Wort gehört, kennt es
+        found = [reply for reply in replies.values() if reply is not None]
+        print(f"{argument}\t{found[0] if found else 0}")
+    else:
+        # die Partitionen sind disjunkt: die k größten aller Teillisten
+        lists = [reply for reply in replies.values() if reply]
+        for key, value in heapq.nlargest(argument, itertools.chain(*lists), key=operator.itemgetter(1)):
+            print(f"{key}\t{value}")
+    missing = args.reducers - len(replies)
+    if missing:
+        print(f"({missing} Reducer ohne Antwort)")
+
+
+def scatter(context, reducers, request):
+    """Sendet die Abfrage an alle Reducer, gibt {Reducer-ID: Antwort} der Antwortenden zurück."""
+    sockets = {}
+    for reducer_id in range(1, reducers + 1):
+        socket = context.socket(zmq.REQ)
+        socket.connect(constMR.endpoint(constMR.QUERY_BASE_PORT + reducer_id - 1))
+        socket.send(pickle.dumps(request))
+        sockets[reducer_id] = socket
+
+    # alle Antworten gleichzeitig abwarten, höchstens QUERY_TIMEOUT Sekunden
+    poller = zmq.Poller()
+    for socket in sockets.values():
+        poller.register(socket, zmq.POLLIN)
+    replies = {}
+    deadline = time.monotonic() + constMR.QUERY_TIMEOUT
+    while len(replies) < len(sockets) and time.monotonic() < deadline:
+        events = dict(poller.poll(int((deadline - time.monotonic()) * 1000)))
+        for reducer_id, socket in sockets.items():
+            if socket in events:
+                replies[reducer_id] = pickle.loads(socket.recv())
+                poller.unregister(socket)
+    for socket in sockets.values():
+        socket.close(linger=0)
+    return replies
+
+
+if __name__ == "__main__":
+    main()
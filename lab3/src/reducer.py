@@ -1,44 +1,180 @@
-import zmq
+import argparse
+import itertools
+import pickle
 import sys
+import time
+
+import zmq
+
+import constMR
+from job import make_job
+from spill import SpillTable
+from topk import TopK
+
+
+def main(argv=None, context=None):
+    # Wir erwarten ein Argument, um zu wissen, welcher Reducer dies ist (python reducer.py 1)
+    parser = argparse.ArgumentParser(description='Reducer der MapReduce-Pipeline')
+    parser.add_argument('id', type=int, help='Nummer des Reducers (1, 2, ...)')
+    parser.add_argument('--max-keys', type=int, default=constMR.MAX_KEYS,
+                        help='höchstens so viele Wörter im Speicher, der Rest wird auf die Platte ausgelagert')
+    args = parser.parse_args(argv)
+
+    my_id = args.id
+
+    # Port auswählen: Reducer 1 -> 5558, Reducer 2 -> 5559, ...
+    port = constMR.REDUCER_BASE_PORT + my_id - 1
 
-def main():
-    # Wir erwarten ein Argument, um zu wissen, ob dies Reducer 1 oder 2 ist
-    if len(sys.argv) < 2:
-        print("Fehler: Bitte ID angeben (python reducer.py 1)")
-        return
+    own_context = context is None  # als Thread: gemeinsamer Context von main.py
+    if own_context:
+        context = zmq.Context()
 
-    my_id = sys.argv[1]
-    
-    # Port auswählen: Reducer 1 -> 5558, Reducer 2 -> 5559
-    if my_id == "1":
-        port = "5558"
-    else:
-        port = "5559"
+    # 1. ROUTER-Socket zum Empfangen der Wort-Batches von den Mappern (und des Endes vom Splitter).
+    # Für jeden verarbeiteten Batch erhält der Mapper einen Credit zurück (Flusskontrolle).
+    receiver = context.socket(zmq.ROUTER)
+    receiver.bind(constMR.endpoint(port, bind=True))
 
-    context = zmq.Context()
+    # 2. ROUTER-Socket für Live-Abfragen (query.py): count(wort) und topk(k) aus dem aktuellen Stand
+    query = context.socket(zmq.ROUTER)
+    query.bind(constMR.endpoint(constMR.QUERY_BASE_PORT + my_id - 1, bind=True))
 
-    # 1. PULL-Socket zum Empfangen der Wörter von den Mappern
-    receiver = context.socket(zmq.PULL)
-    receiver.bind(f"tcp://*:{port}")
+    # 3. Beim Splitter registrieren, damit die Mapper unseren Endpunkt erfahren.
+    # Die Antwort nennt den Job (z.B. 'wordcount').
+    control = context.socket(zmq.REQ)
+    control.connect(constMR.endpoint(constMR.CONTROL_PORT))
+    control.send(pickle.dumps(('reducer', my_id, constMR.endpoint(port))))
+    reply = pickle.loads(control.recv())
+    control.close()
+    if 'error' in reply:  # zu spät: der Job läuft schon mit einer festen Menge von Reducern
+        print(f"[Reducer {my_id}] Abgelehnt: {reply['error']}")
+        query.close(linger=0)
+        receiver.close(linger=0)
+        if own_context:
+            context.term()
+        return 1
+    job = make_job(reply['job'])
 
     print(f"Reducer {my_id} gestartet auf Port {port}. Warte auf Wörter...")
 
-    # Lokaler Zähler (Dictionary) für Wortanzahlen (zählt für jedes vorkommende Wort die Anzahl)
-    word_count = {}
+    # Lokale Tabelle (Schlüssel -> Teilwert, beim Wordcount: Wort -> Anzahl),
+    # bei begrenztem Speicher werden sortierte Runs auf die Platte ausgelagert
+    table = SpillTable(job.merge, job.merge_partials, args.max_keys, prefix=f"reducer{my_id}-")
+    # die Schlüssel mit den höchsten Werten für topk, mit jedem Batch nachgeführt (nur Jobs mit score)
+    top = TopK(constMR.TOPK_TRACKED) if job.score is not None else None
+    total = 0  # Anzahl aller Paare (beim Wordcount: gezählte Vorkommen)
+    done_tasks = set()  # Aufgaben, deren Wörter vollständig angekommen sind
+    duplicates = 0  # verworfene Kopien von Aufgaben (Nachzügler-Behandlung des Splitters)
+    metrics = {'batches': 0, 'tasks': 0, 'keys': 0, 'runs': 0, 'senders': 0}  # für ('stats',)-Abfragen
+    senders = set()  # Mapper, die schon Batches gesendet haben
+    task_count = None  # Anzahl aller Aufgaben, bekannt nach dem Ende des Datenstroms
+    busy = 0.0
+    first = None
+    next_status = time.monotonic()
 
+    poller = zmq.Poller()
+    poller.register(receiver, zmq.POLLIN)
+    poller.register(query, zmq.POLLIN)
+
+    while task_count is None or len(done_tasks) < task_count:
+        events = dict(poller.poll())
+        if query in events:
+            answer_query(query, job, table, top, metrics)
+        if receiver not in events:
+            continue
+        identity, payload = receiver.recv_multipart()
+        message = pickle.loads(payload)
+        if message[0] == 'eos':
+            task_count = message[1]
+            print(f"[Reducer {my_id}] Ende des Datenstroms: {task_count} Aufgaben")
+            continue
+
+        # Empfange einen Batch (pro Aufgabe Schlüssel -> Teilwert) und addiere jede Aufgabe auf einmal.
+        # Eine Aufgabe, die schon angekommen ist (von einem anderen Mapper), wird verworfen.
+        _, entries = message
+        started = time.perf_counter()
+        first = first or time.time()
+        keys = records = 0
+        for task_id, part in entries:
+            if task_id in done_tasks:
+                duplicates += 1
+                continue
+            done_tasks.add(task_id)
+            table.update(part)
+            if top is not None:
+                update_top(top, job, table, part)
+            keys += len(part)
+            records += job.records(part)
+        total += records
+        busy += time.perf_counter() - started
+        receiver.send_multipart([identity, pickle.dumps(('credit', 1))])  # Batch verarbeitet: Credit zurück
+        senders.add(identity)
+        metrics.update(batches=metrics['batches'] + 1, tasks=len(done_tasks), keys=len(table),
+                       runs=len(table.runs), senders=len(senders))
+
+        # Ausgabe des aktuellen Standes, höchstens einmal pro STATUS_INTERVAL
+        # (der aktuelle Zähler eines Wortes lässt sich mit query.py abfragen)
+        if time.monotonic() >= next_status:
+            print(f"[Reducer {my_id}] Batch mit {keys} Schlüsseln ({records} Paare), "
+                  f"gesamt {total} Paare, {len(table)} Schlüssel im Speicher, {len(table.runs)} Runs")
+            next_status = time.monotonic() + constMR.STATUS_INTERVAL
+
+    # 4. Endergebnis der Partition (reduce pro Schlüssel) sortiert und in Stücken als
+    # Zeilen an die Sink senden (Strom aus dem k-Wege-Mischen, nie die ganze Partition im Speicher)
+    sink = context.socket(zmq.PUSH)
+    sink.connect(constMR.endpoint(constMR.SINK_PORT))
+    distinct = 0
+    runs = len(table.runs)
+    lines = (job.format(key, job.finish(key, partial)) for key, partial in table.items())
     while True:
-        # Empfange ein Wort
-        word = receiver.recv_string()
-        print(f"Reducer {my_id} empfangen: {word}")
+        chunk = list(itertools.islice(lines, constMR.RESULT_CHUNK))
+        if not chunk:
+            break
+        distinct += len(chunk)
+        sink.send(pickle.dumps(('result', my_id, chunk)))
+    table.close()
+    stats = {'words': total, 'distinct': distinct, 'runs': runs, 'duplicates': duplicates, 'busy_s': busy,
+             'active_s': time.time() - first if first else 0.0}
+    sink.send(pickle.dumps(('done', my_id, stats)))
+    sink.close(linger=-1)
+    query.close(linger=0)
+    receiver.close(linger=0)
+    if own_context:
+        context.term()
+    print(f"[Reducer {my_id}] Fertig: {distinct} Schlüssel, {total} Paare, {runs} Runs")
+
+
+def update_top(top, job, table, part):
+    """Führt die Top-Schlüssel nach einem Batch nach, ohne alle Schlüssel zu sortieren."""
+    for key, partial in part.items():
+        if key in top:  # score ist additiv: der Wert wächst um den Teilwert des Batches
+            top.offer(key, top.values[key] + job.score(partial))
+            continue
+        value = job.score(table.values.get(key, partial))
+        if table.runs:
+            # Teile des Wertes können in Runs liegen: nur für Kandidaten exakt nachschlagen.
+            # (Schlüssel, deren Wert im Speicher unter der Schwelle liegt, werden nicht
+            # nachgeschlagen, mit Runs ist topk daher eine Näherung.)
+            threshold = top.threshold()
+            if threshold is None or value > threshold:
+                value = job.score(table.get(key))
+        top.offer(key, value)
+
 
-        # Zähle das Wort
-        if word in word_count:
-            word_count[word] += 1
-        else:
-            word_count[word] = 1
+def answer_query(query, job, table, top, metrics):
+    """Beantwortet eine Abfrage ('count', wort), ('topk', k) oder ('stats', None) aus dem aktuellen Stand."""
+    identity, _, payload = query.recv_multipart()  # REQ-Umschlag: Absender, Leerframe, Daten
+    kind, argument = pickle.loads(payload)
+    reply = None
+    if kind == 'count':
+        partial = table.get(argument)
+        reply = None if partial is None else job.finish(argument, partial)
+    elif kind == 'topk' and top is not None:
+        reply = top.top(min(argument, top.size))
+    elif kind == 'stats':
+        # höchstens senders * REDUCER_CREDITS Batches können in der Warteschlange stehen
+        reply = {**metrics, 'queue_bound': metrics['senders'] * constMR.REDUCER_CREDITS}
+    query.send_multipart([identity, b'', pickle.dumps(reply)])
 
-        # Ausgabe des aktuellen Standes für das empfangene Wort
-        print(f"[Reducer {my_id}] {word}: {word_count[word]}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
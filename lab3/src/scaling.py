@@ -0,0 +1,78 @@
+# Skalierungskurve der MapReduce-Pipeline
+# Startet main.py im Bulk-Modus nacheinander mit 1, 2, ..., N Mappern (ohne Autoskalierung)
+# und gibt Laufzeit, Durchsatz und Speedup aus. Die Messwerte stammen aus dem Bericht der Sink.
+
+import argparse
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+
+from main import available_cores
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Skalierungskurve der Mapper (1 bis N Kerne)')
+    parser.add_argument('filename', help='Eingabedatei (großer Korpus)')
+    parser.add_argument('--generate', type=int, metavar='MB',
+                        help='Eingabedatei zuerst mit so vielen MB Zufallstext erzeugen')
+    parser.add_argument('--max-mappers', type=int, default=available_cores(), help='N (Standard: alle Kerne)')
+    parser.add_argument('--reducers', type=int, default=2, help='Anzahl Reducer')
+    parser.add_argument('--output', help='Messwerte zusätzlich als JSON in diese Datei schreiben')
+    args = parser.parse_args()
+
+    if args.generate:
+        generate_corpus(args.filename, args.generate)
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    results = []
+    for mappers in range(1, args.max_mappers + 1):
+        cmd = [sys.executable, "-u", os.path.join(base_dir, "main.py"), args.filename, "--bulk",
+               "--no-autoscale", "--mappers", str(mappers), "--reducers", str(args.reducers)]
+        output = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT).stdout.decode('utf-8')
+        report = find_report(output)
+        if report is None:
+            print(f"{mappers} Mapper: kein Bericht der Sink erhalten")
+            continue
+        results.append({'mappers': mappers, 'makespan_s': report['makespan_s'],
+                        'words_per_s': report['words_per_s']})
+        print_row(results[0], results[-1])
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+def find_report(output):
+    """Letzte Zeile mit dem JSON-Bericht der Sink (main.py setzt Präfix und Farbe davor)."""
+    for line in reversed(output.splitlines()):
+        if '{"makespan_s"' in line:
+            return json.loads(line[line.index('{'):line.rindex('}') + 1])
+    return None
+
+
+def print_row(first, row):
+    speedup = first['makespan_s'] / row['makespan_s'] if row['makespan_s'] else 0.0
+    print(f"{row['mappers']:3d} Mapper: {row['makespan_s']:8.2f} s, {row['words_per_s']:12.0f} Wörter/s, "
+          f"Speedup {speedup:5.2f}, Effizienz {speedup / row['mappers']:.0%}")
+
+
+def generate_corpus(filename, megabytes):
+    """Schreibt Zufallssätze (Zipf-ähnlich verteilte Wörter) bis zur gewünschten Größe."""
+    vocabulary = [f"wort{i}" for i in range(50000)]
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+    size = 0
+    with open(filename, 'w', encoding='utf-8') as f:
+        while size < megabytes * 1e6:
+            lines = [" ".join(random.choices(vocabulary, cum_weights=cum_weights, k=random.randint(3, 15)))
+                     for _ in range(10000)]
+            text = "\n".join(lines) + "\n"
+            f.write(text)
+            size += len(text)
+    print(f"{filename}: {size / 1e6:.0f} MB Zufallstext erzeugt")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+# Function: Sink der MapReduce-Pipeline
+# Binds PULL socket to tcp://localhost:5555 (or the ipc/inproc endpoint of that port)
+# Sammelt die Endergebnisse aller Reducer, schreibt sie sortiert in eine Datei
+# und misst die Laufzeit des Jobs
+
+import argparse
+import heapq
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import time
+
+import zmq
+
+import constMR
+
+
+def main(argv=None, context=None):
+    parser = argparse.ArgumentParser(description='Sink der MapReduce-Pipeline')
+    parser.add_argument('--reducers', type=int, default=2, help='Anzahl Reducer, deren Ergebnis erwartet wird')
+    parser.add_argument('--output', default=constMR.RESULT_FILE, help='Ergebnisdatei')
+    args = parser.parse_args(argv)
+
+    own_context = context is None  # als Thread: gemeinsamer Context von main.py
+    if own_context:
+        context = zmq.Context()
+    receiver = context.socket(zmq.PULL)
+    receiver.bind(constMR.endpoint(constMR.SINK_PORT, bind=True))
+    print(f"Sink gestartet auf Port {constMR.SINK_PORT}. Warte auf {args.reducers} Reducer...")
+
+    # Jede Partition kommt sortiert an und wird zuerst in eine eigene Datei geschrieben
+    part_dir = tempfile.mkdtemp(prefix='mapreduce-')
+    parts = {}  # Reducer-ID -> Datei
+    reducers = {}  # Reducer-ID -> Statistik
+    mappers = {}  # Mapper-ID -> letzte Statistik
+    splitter = None
+    start = None
+    expected = args.reducers  # der Splitter meldet, wie viele Reducer tatsächlich laufen
+
+    while len(reducers) < expected:
+        message = pickle.loads(receiver.recv())
+        kind = message[0]
+        if kind == 'start':
+            start = message[1]
+        elif kind == 'reducers':
+            expected = message[1]
+        elif kind == 'splitter':
+            splitter = message[1]
+        elif kind == 'mapper':
+            mappers[message[1]] = message[2]
+        elif kind == 'result':
+            reducer_id, lines = message[1], message[2]  # Ergebniszeilen "Schlüssel<Tab>Wert"
+            if reducer_id not in parts:
+                parts[reducer_id] = open(os.path.join(part_dir, f"part{reducer_id}"), 'w', encoding='utf-8')
+            parts[reducer_id].writelines(f"{line}\n" for line in lines)
+        elif kind == 'done':
+            reducers[message[1]] = message[2]
+            if message[1] in parts:
+                parts[message[1]].close()
+            print(f"Reducer {message[1]} fertig ({len(reducers)}/{expected}).")
+    end = time.time()
+
+    # Die Partitionen sind disjunkt und sortiert: k-Wege-Mischen ergibt die sortierte Gesamtliste
+    files = [open(part.name, encoding='utf-8') for part in parts.values()]
+    with open(args.output, 'w', encoding='utf-8') as out:
+        out.writelines(heapq.merge(*files, key=lambda line: line.split('\t', 1)[0]))
+    for f in files:
+        f.close()
+    shutil.rmtree(part_dir)
+
+    receiver.close(linger=0)
+    if own_context:
+        context.term()
+
+    report = make_report(start, end, splitter, mappers, reducers)
+    print_report(report, args.output)
+    print(json.dumps(report))
+    return report
+
+
+def make_report(start, end, splitter, mappers, reducers):
+    """Laufzeit des Jobs und Durchsatz jeder Stufe."""
+    makespan = end - start if start else None
+    words = sum(stats['words'] for stats in reducers.values())
+
+    def rate(amount, seconds):
+        return round(amount / seconds, 1) if seconds else None
+
+    return {
+        'makespan_s': round(makespan, 3) if makespan else None,
+        'words': words,
+        'distinct': sum(stats['distinct'] for stats in reducers.values()),
+        'words_per_s': rate(words, makespan),
+        'splitter': splitter and {**splitter, 'MBps': rate(splitter['bytes'] / 1e6, splitter['seconds'])},
+        'mappers': {mapper_id: {**stats, 'words_per_busy_s': rate(stats['words'], stats['busy_s'])}
+                    for mapper_id, stats in mappers.items()},
+        'reducers': {reducer_id: {**stats, 'words_per_busy_s': rate(stats['words'], stats['busy_s'])}
+                     for reducer_id, stats in sorted(reducers.items())},
+    }
+
+
+def print_report(report, output):
+    print(f"Job fertig in {report['makespan_s']} s: {report['words']} Wörter "
+          f"({report['distinct']} verschiedene), {report['words_per_s']} Wörter/s")
+    if report['splitter']:
+        s = report['splitter']
+        print(f"  Splitter: {s['tasks']} Aufgaben, {s['bytes']} Bytes in {s['seconds']:.2f} s ({s['MBps']} MB/s), "
+              f"{s['speculative']} Kopien für Nachzügler, höchstens {s['max_outstanding']} Aufgaben offen")
+    for mapper_id, m in report['mappers'].items():
+        print(f"  Mapper {mapper_id}: {m['tasks']} Aufgaben, {m['words']} Wörter, "
+              f"beschäftigt {m['busy_s']:.2f} s ({m['words_per_busy_s']} Wörter/s), "
+              f"{m['credit_wait_s']:.2f} s auf Credits der Reducer gewartet")
+    for reducer_id, r in report['reducers'].items():
+        print(f"  Reducer {reducer_id}: {r['words']} Vorkommen, {r['distinct']} Wörter, "
+              f"{r['duplicates']} doppelte Aufgaben verworfen, beschäftigt {r['busy_s']:.2f} s ({r['words_per_busy_s']} Wörter/s)")
+    print(f"Ergebnis in {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import bisect
+import heapq
+import itertools
+import operator
+import os
+import pickle
+import shutil
+import tempfile
+
+MERGE_FANIN = 64  # höchstens so viele Runs werden gleichzeitig gemischt (offene Dateien)
+INDEX_EVERY = 256  # jeder so vielte Schlüssel eines Runs steht mit seiner Position im Index (für get())
+
+
+class SpillTable:
+    """
+    Tabelle (Schlüssel -> Teilwert) mit begrenztem Speicher.
+    Hat die Tabelle mehr als max_keys Schlüssel, wird sie sortiert als Run auf die
+    Platte geschrieben und geleert. items() mischt alle Runs und den Rest im
+    Speicher (k-Wege-Mischen) und fasst dabei die Teilwerte gleicher Schlüssel zusammen.
+    merge(target, batch) addiert einen Batch in ein dict, combine(key, partials)
+    fasst Teilwerte zusammen (siehe Job.merge und Job.merge_partials).
+    Für einzelne Schlüssel (get) hat jeder Run einen dünnen Index im Speicher.
+    """
+
+    def __init__(self, merge, combine, max_keys=None, prefix='spill-'):
+        self.merge = merge
+        self.combine = combine
+        self.max_keys = max_keys  # None: unbegrenzt, nie auslagern
+        self.prefix = prefix
+        self.values = {}
+        self.runs = []  # Dateinamen der Runs
+        self.indexes = {}  # Run -> (Schlüssel, Dateipositionen) jedes INDEX_EVERY-ten Eintrags
+        self.run_ids = itertools.count()
+        self.directory = None
+
+    def update(self, batch):
+        self.merge(self.values, batch)
+        if self.max_keys is not None and len(self.values) > self.max_keys:
+            self.spill()
+
+    def __len__(self):
+        # Schlüssel im Speicher (in Runs können weitere liegen)
+        return len(self.values)
+
+    def spill(self):
+        if self.directory is None:
+            self.directory = tempfile.mkdtemp(prefix=self.prefix)
+        path = os.path.join(self.directory, f"run{next(self.run_ids)}")
+        self.indexes[path] = _write_run(path, sorted(self.values.items()))
+        self.runs.append(path)
+        self.values.clear()
+
+    def items(self):
+        """Alle (Schlüssel, Teilwert)-Paare sortiert nach Schlüssel, als Strom."""
+        while len(self.runs) > MERGE_FANIN:  # zu viele Runs: zuerst einen Teil zusammenfassen
+            path = os.path.join(self.directory, f"run{next(self.run_ids)}")
+            self.indexes[path] = _write_run(path, self._combine(_merge(map(_read_run, self.runs[:MERGE_FANIN]))))
+            for run in self.runs[:MERGE_FANIN]:
+                os.remove(run)
+                del self.indexes[run]
+            self.runs = self.runs[MERGE_FANIN:] + [path]
+        streams = [_read_run(run) for run in self.runs] + [iter(sorted(self.values.items()))]
+        yield from self._combine(_merge(streams))
+
+    def get(self, key):
+        """Aktueller Teilwert eines Schlüssels aus Speicher und Runs (None: unbekannt)."""
+        partials = [partial for partial in (_lookup(run, self.indexes[run], key) for run in self.runs)
+                    if partial is not None]
+        if key in self.values:
+            partials.append(self.values[key])
+        if len(partials) <= 1:
+            return partials[0] if partials else None
+        return self.combine(key, partials)
+
+    def _combine(self, items):
+        # aufeinanderfolgende gleiche Schlüssel zusammenfassen
+        for key, group in itertools.groupby(items, key=operator.itemgetter(0)):
+            partials = [partial for _, partial in group]
+            yield key, partials[0] if len(partials) == 1 else self.combine(key, partials)
+
+    def close(self):
+        if self.directory is not None:
+            shutil.rmtree(self.directory)
+            self.directory = None
+        self.runs = []
+        self.indexes = {}
+        self.values.clear()
+
+
+def _write_run(path, items):
+    # schreibt den Run und gibt seinen Index zurück
+    keys, offsets = [], []
+    with open(path, 'wb') as f:
+        for number, item in enumerate(items):
+            if number % INDEX_EVERY == 0:
+                keys.append(item[0])
+                offsets.append(f.tell())
+            pickle.dump(item, f)
+    return keys, offsets
+
+
+def _read_run(path):
+    with open(path, 'rb') as f:
+        while True:
+            try:
+                yield pickle.load(f)
+            except EOFError:
+                return
+
+
+def _lookup(path, index, key):
+    # über den Index zur richtigen Stelle springen, dann höchstens INDEX_EVERY Einträge lesen
+    keys, offsets = index
+    position = bisect.bisect_right(keys, key) - 1
+    if position < 0:
+        return None
+    with open(path, 'rb') as f:
+        f.seek(offsets[position])
+        for _ in range(INDEX_EVERY):
+            try:
+                found, partial = pickle.load(f)
+            except EOFError:
+                return None
+            if found == key:
+                return partial
+            if found > key:
+                return None
+    return None
+
+
+def _merge(streams):
+    return heapq.merge(*streams, key=operator.itemgetter(0))
@@ -1,55 +1,317 @@
 # Function: Task ventilator
-# Binds PUSH socket to tcp://localhost:5557
-# Sends messages to mapper via that socket
+# Binds ROUTER socket to tcp://localhost:5557 (or the ipc/inproc endpoint of that port)
+# Sends tasks to the mappers that requested them via that socket
 
-import zmq
-import time
-import sys
-import random
+import argparse
+import collections
 import os
+import pickle
+import random
+import statistics
+import sys
+import time
+
+import zmq
+
+import constMR
+from job import make_job
 
-def main ():
-    context = zmq.Context()
+def main(argv=None, context=None):
+    parser = argparse.ArgumentParser(description='Splitter (Ventilator) der MapReduce-Pipeline')
+    parser.add_argument('filename', nargs='?', help='Eingabedatei (ohne: Zufallssätze)')
+    parser.add_argument('--bulk', action='store_true',
+                        help='ungebremst senden, Zeilen zu Nachrichten von bis zu TASK_BYTES bündeln')
+    parser.add_argument('--reducers', type=int, default=2, help='Anzahl Reducer, auf die gewartet wird')
+    parser.add_argument('--sentences', type=int, default=100, help='Anzahl Zufallssätze')
+    parser.add_argument('--job', default='wordcount',
+                        help='MapReduce-Job, "name" oder "name:argument" (z.B. grep:fehler)')
+    args = parser.parse_args(argv)
+    try:
+        make_job(args.job)  # unbekannte Jobs sofort melden
+    except ValueError as e:
+        print(f"Fehler: {e}")
+        return 1
+    if args.filename and not os.path.exists(args.filename):
+        print(f"Fehler: Datei '{args.filename}' nicht gefunden.")
+        return 1
 
-    # PUSH-Socket zum Senden der Aufgaben (Sätze) an die Mapper
-    # Wir binden an Port 5557 (wie im C-Beispiel der Ventilator)
-    sender = context.socket(zmq.PUSH)
-    sender.bind("tcp://*:5557")
+    own_context = context is None  # als Thread: gemeinsamer Context von main.py
+    if own_context:
+        context = zmq.Context()
 
-    print("Splitter (Ventilator) gestartet auf Port 5557.")
-    print("Drücke Enter, sobald die Mapper und Reducer bereit sind...")
-    input()  # Warten, um das "Slow Joiner" Problem zu vermeiden, da sonst Sätze verloren gehen können
+    # ROUTER-Socket zum Verteilen der Aufgaben (Sätze) an die Mapper
+    # Wir binden an Port 5557 (wie im C-Beispiel der Ventilator). Die Mapper fordern
+    # Aufgaben an, so können während des Jobs Mapper hinzukommen und gehen.
+    sender = context.socket(zmq.ROUTER)
+    sender.bind(constMR.endpoint(constMR.SPLITTER_PORT, bind=True))
+
+    print(f"Splitter (Ventilator) gestartet auf Port {constMR.SPLITTER_PORT}.")
+    # Warten, bis alle Reducer registriert sind, erst dann erhalten die Mapper ihre Konfiguration
+    registry = Registry(context, args.job)
+    config = registry.wait_for_reducers(args.reducers)
+    if not config:
+        print("Fehler: kein Reducer hat sich gemeldet.")
+        sender.close(linger=0)
+        registry.control.close(linger=0)
+        if own_context:
+            context.term()
+        return 1
+    # Sink: erhält den Startzeitpunkt, die Anzahl der tatsächlich gestarteten Reducer
+    # (nach einem Timeout weniger als --reducers) und die Statistik des Splitters
+    sink = context.socket(zmq.PUSH)
+    sink.connect(constMR.endpoint(constMR.SINK_PORT))
+    sink.send(pickle.dumps(('start', time.time())))
+    sink.send(pickle.dumps(('reducers', len(config['reducers']))))
     print("Sende Aufgaben...")
 
-    # Prüfen, ob eine Datei als Argument übergeben wurde
-    if len(sys.argv) > 1:
-        filename = sys.argv[1]
-        if os.path.exists(filename):
-            print(f"Lese Sätze aus Datei: {filename}")
-            send_from_file(sender, filename)
+    tasks = TaskDispatcher(sender, registry)
+    start = time.perf_counter()
+    if args.filename:
+        print(f"Lese Sätze aus Datei: {args.filename}")
+        if args.bulk:
+            send_file_bulk(tasks, args.filename)
         else:
-            print(f"Fehler: Datei '{filename}' nicht gefunden.")
-            return
+            send_from_file(tasks, args.filename)
     else:
         print("Keine Datei angegeben. Generiere Zufallssätze...")
-        send_generated_sentences(sender)
+        send_generated_sentences(tasks, args.sentences, args.bulk)
+    tasks.finish()  # wartet auf alle Bestätigungen, dann beenden sich die Mapper
+    seconds = time.perf_counter() - start
+    print(f"{tasks.count} Aufgaben, {tasks.bytes} Bytes in {seconds:.2f} s gesendet "
+          f"({tasks.bytes / max(seconds, 1e-9) / 1e6:.1f} MB/s), {tasks.speculative} Kopien")
+
+    # Ende des Datenstroms: die Reducer erfahren, wie viele Aufgaben es insgesamt gibt.
+    # Sie sind fertig, sobald sie von den Mappern alle Aufgaben-IDs erhalten haben.
+    for endpoint in config['reducers']:
+        eos = context.socket(zmq.DEALER)
+        eos.connect(endpoint)
+        eos.send(pickle.dumps(('eos', tasks.count)))
+        eos.close(linger=-1)
+    sink.send(pickle.dumps(('splitter', {'tasks': tasks.count, 'bytes': tasks.bytes, 'seconds': seconds,
+                                           'speculative': tasks.speculative, 'max_outstanding': tasks.max_outstanding})))
 
-    # Kurze Pause zum Leeren des Puffers
-    time.sleep(1)
+    # Warten, bis die Puffer geleert sind
+    sender.close(linger=-1)
+    sink.close(linger=-1)
+    registry.control.close(linger=0)
+    if own_context:
+        context.term()
     print("Fertig mit Senden.")
+    return 0
+
+
+class TaskDispatcher:
+    """
+    Verteilt nummerierte Aufgaben (Task-ID als erster Frame) an die Mapper.
+    Ein Mapper fordert mit ('credit', n) n weitere Aufgaben an, gesendet wird nur an
+    Mapper mit Credit. Neue Mapper kommen so sofort zum Zug. Meldet sich ein Mapper
+    mit ('retire',) ab, erhält er einen leeren Stopp-Frame und danach keine Aufgabe mehr.
+
+    Nach dem Senden ihrer Batches bestätigen die Mapper die Aufgaben mit ('done', [ids]).
+    Bis dahin bleibt eine Aufgabe offen. Ist sie überfällig (SPECULATE_FACTOR mal die
+    mittlere Dauer bis zur Bestätigung), erhält ein anderer Mapper eine Kopie, und der
+    langsame Mapper pausiert: er behält seine Credits, bekommt aber bis zu seiner
+    nächsten Bestätigung oder seinem nächsten Credit nichts mehr. Doppelte
+    Ergebnisse verwerfen die Reducer anhand der Task-ID.
+    """
+
+    def __init__(self, socket, registry):
+        self.socket = socket
+        self.registry = registry  # nimmt weiter Mapper-Registrierungen an
+        self.credits = {}  # Mapper-Identität -> freie Credits (nur Mapper mit Credit)
+        self.paused = set()  # Nachzügler, die trotz Credit vorerst nichts erhalten
+        self.mappers = set()  # aktive Mapper
+        self.outstanding = {}  # Task-ID -> {'data', 'owners', 'sent'} der unbestätigten Aufgaben
+        self.durations = collections.deque(maxlen=100)  # Sekunden bis zur Bestätigung
+        self.poller = zmq.Poller()
+        self.poller.register(socket, zmq.POLLIN)
+        self.poller.register(registry.control, zmq.POLLIN)
+        self.count = 0
+        self.bytes = 0
+        self.speculative = 0  # gesendete Kopien
+        self.max_outstanding = 0  # höchstens so viele Aufgaben waren gleichzeitig offen
+        self.next_status = time.monotonic()
+
+    def send(self, data):
+        self._serve(0)
+        self._speculate()
+        while not self._ready():  # warten, bis ein Mapper Aufgaben anfordert
+            self._serve(1000)
+            self._speculate()
+        identity = max(self._ready(), key=self.credits.get)  # Mapper mit den meisten freien Credits
+        self._dispatch(identity, self.count, data)
+        self.outstanding[self.count] = {'data': data, 'owners': {identity}, 'sent': time.monotonic()}
+        self.count += 1
+        self.bytes += len(data)
+        self.max_outstanding = max(self.max_outstanding, len(self.outstanding))
+        if time.monotonic() >= self.next_status:
+            # offene Aufgaben: in den Warteschlangen der Mapper oder noch nicht bestätigt
+            print(f"Status: {len(self.outstanding)} Aufgaben offen, {sum(self.credits.values())} freie Credits "
+                  f"bei {len(self.mappers)} Mappern")
+            self.next_status = time.monotonic() + constMR.STATUS_INTERVAL
+
+    def finish(self):
+        """Nach der letzten Aufgabe: auf alle Bestätigungen warten, dann allen Mappern den Stopp-Frame senden."""
+        while self.outstanding:
+            self._serve(100)
+            self._speculate()
+        for identity in self.mappers:
+            self.socket.send_multipart([identity, b'', b''])
+        self.mappers.clear()
+        self.credits.clear()
+        self.paused.clear()
 
-def send_from_file(socket, filename):
+    def _ready(self):
+        # Mapper mit Credit, die nicht pausiert sind
+        return [identity for identity in self.credits if identity not in self.paused]
+
+    def _dispatch(self, identity, task_id, data):
+        self.socket.send_multipart([identity, str(task_id).encode(), data])
+        self.credits[identity] -= 1
+        if not self.credits[identity]:
+            del self.credits[identity]
+
+    def _deadline(self):
+        # Sekunden, nach denen eine unbestätigte Aufgabe als überfällig gilt
+        if not self.durations:
+            return constMR.TASK_TIMEOUT
+        return max(constMR.SPECULATE_MIN_S, constMR.SPECULATE_FACTOR * statistics.median(self.durations))
+
+    def _speculate(self):
+        # überfällige Aufgaben (Nachzügler, ausgefallene Mapper) an einen anderen Mapper mit Credit senden
+        now = time.monotonic()
+        deadline = self._deadline()
+        for task_id, task in self.outstanding.items():
+            if now - task['sent'] < deadline:
+                continue
+            candidates = [identity for identity in self._ready() if identity not in task['owners']]
+            if not candidates:
+                continue  # z.B. nur ein Mapper: weiter auf ihn warten
+            identity = max(candidates, key=self.credits.get)
+            self._dispatch(identity, task_id, task['data'])
+            self.paused.update(task['owners'])  # bis zur nächsten Bestätigung oder zum nächsten Credit
+            task['owners'].add(identity)
+            task['sent'] = now
+            self.speculative += 1
+            print(f"Aufgabe {task_id} überfällig, Kopie gesendet.")
+
+    def _serve(self, timeout):
+        # Credits, Bestätigungen, Abmeldungen und Registrierungen verarbeiten
+        for socket, _ in self.poller.poll(timeout):
+            if socket is self.registry.control:
+                self.registry.handle()
+                continue
+            identity, payload = self.socket.recv_multipart()
+            kind, *info = pickle.loads(payload)
+            self.paused.discard(identity)  # meldet sich wieder: nicht mehr pausiert
+            if kind == 'credit':
+                self.mappers.add(identity)
+                self.credits[identity] = self.credits.get(identity, 0) + info[0]
+            elif kind == 'done':
+                for task_id in info[0]:
+                    task = self.outstanding.pop(task_id, None)  # Kopien werden nur einmal gezählt
+                    if task is not None:
+                        self.durations.append(time.monotonic() - task['sent'])
+            elif kind == 'retire':
+                self.mappers.discard(identity)
+                self.credits.pop(identity, None)
+                self.socket.send_multipart([identity, b'', b''])
+
+
+class Registry:
+    """
+    Kontroll-Socket (ROUTER) des Splitters.
+    Reducer melden ('reducer', id, endpunkt) und erhalten {'job': job}, Mapper ('mapper',).
+    Die Mapper erhalten, sobald alle Reducer bekannt sind, die Konfiguration
+    {'reducers': [endpunkte], 'job': job}, auch wenn sie erst während des Jobs hinzukommen.
+    Ab dann steht die Menge der Reducer fest (alle Mapper bilden denselben Ring, EOS
+    erreicht jeden Reducer): spätere Reducer erhalten {'error': grund}.
+    """
+
+    def __init__(self, context, job):
+        self.control = context.socket(zmq.ROUTER)
+        self.control.bind(constMR.endpoint(constMR.CONTROL_PORT, bind=True))
+        self.endpoints = {}  # Reducer-ID -> Endpunkt
+        self.waiting = []  # Mapper, die noch auf die Konfiguration warten
+        self.expected = None  # Anzahl Reducer, vorher erhalten Mapper keine Antwort
+        self.job = job  # Job-Beschreibung 'name' oder 'name:argument'
+        self.frozen = False  # True, sobald Mapper die Konfiguration erhalten haben
+
+    def config(self):
+        return {'reducers': [self.endpoints[i] for i in sorted(self.endpoints)], 'job': self.job}
+
+    def handle(self):
+        identity, _, payload = self.control.recv_multipart()  # REQ-Umschlag: Absender, Leerframe, Daten
+        role, *info = pickle.loads(payload)
+        if role == 'reducer' and self.frozen and info[0] not in self.endpoints:
+            reason = f"Reducer stehen fest ({len(self.endpoints)}), Reducer {info[0]} kommt zu spät"
+            self.control.send_multipart([identity, b'', pickle.dumps({'error': reason})])
+            print(f"{reason}, abgelehnt.")
+            return
+        if role == 'reducer':
+            self.endpoints[info[0]] = info[1]
+            self.control.send_multipart([identity, b'', pickle.dumps({'job': self.job})])
+            print(f"Reducer {info[0]} bereit auf {info[1]} ({len(self.endpoints)}/{self.expected}).")
+        else:
+            self.waiting.append(identity)
+        if self.expected is not None and len(self.endpoints) >= self.expected:
+            self.release()
+
+    def release(self):
+        # wartenden Mappern die Konfiguration senden, ab jetzt keine neuen Reducer mehr
+        self.frozen = True
+        for identity in self.waiting:
+            self.control.send_multipart([identity, b'', pickle.dumps(self.config())])
+            print("Mapper bereit.")
+        self.waiting.clear()
+
+    def wait_for_reducers(self, reducers):
+        """Wartet auf die Reducer, gibt die Konfiguration zurück (None ohne Reducer)."""
+        self.expected = reducers
+        deadline = time.monotonic() + constMR.READY_TIMEOUT
+        while len(self.endpoints) < reducers:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not self.control.poll(int(remaining * 1000)):
+                print(f"Nur {len(self.endpoints)} von {reducers} Reducern bereit, starte trotzdem.")
+                break
+            self.handle()
+        if not self.endpoints:
+            return None
+        self.expected = len(self.endpoints)  # nach Timeout: mit den bekannten Reducern starten
+        self.release()
+        return self.config()
+
+
+def send_from_file(tasks, filename):
     """Liest eine Datei Zeile für Zeile und sendet sie."""
     with open(filename, 'r', encoding='utf-8') as f:
         for line in f:
             line = line.strip() # Leerzeichen und Zeilenumbrüche entfernen
             if line: # Leere Zeilen überspringen
-                socket.send_string(line)
+                tasks.send(line.encode('utf-8'))
                 print(f"Gesendet (Datei): {line}")
                 # Kleine Bremse, damit wir im Terminal mitlesen können
                 time.sleep(0.05)
 
-def send_generated_sentences(socket):
+def send_file_bulk(tasks, filename):
+    """Liest die Datei in großen Blöcken und sendet jeweils ganze Zeilen, bis zu TASK_BYTES pro Nachricht."""
+    rest = b''  # angefangene Zeile am Ende des letzten Blocks
+    with open(filename, 'rb') as f:
+        while True:
+            block = f.read(constMR.TASK_BYTES)
+            if not block:
+                break
+            block = rest + block
+            cut = block.rfind(b'\n') + 1  # nur an Zeilenenden trennen (sicher für UTF-8)
+            if cut == 0:
+                rest = block  # noch kein Zeilenende, weiterlesen
+                continue
+            tasks.send(block[:cut])
+            rest = block[cut:]
+    if rest:
+        tasks.send(rest)
+
+def send_generated_sentences(tasks, count, bulk):
     """Generiert neue Sätze aus einem Wörter-Pool und sendet sie."""
     # Unser Vokabular
     vocabulary = [
@@ -76,8 +338,10 @@ def send_generated_sentences(socket):
         "super", "klasse", "genial", "schlecht", "ok"
     ]
     
-    # Wir generieren 100 Sätze
-    for i in range(100):
+    batch = []  # Bulk-Modus: gesammelte Sätze
+    batch_bytes = 0
+    # Wir generieren count Sätze
+    for i in range(count):
         # Zufällige Satzlänge zwischen 3 und 7 Wörtern
         length = random.randint(3, 7)
         
@@ -87,12 +351,22 @@ def send_generated_sentences(socket):
         
         # Baue den Satz zusammen
         sentence = " ".join(words)
-        
-        socket.send_string(sentence)
-        print(f"Gesendet ({i+1}/100): {sentence}")
+
+        if bulk:
+            batch.append(sentence)
+            batch_bytes += len(sentence.encode('utf-8')) + 1
+            if batch_bytes >= constMR.TASK_BYTES:
+                tasks.send("\n".join(batch).encode('utf-8'))
+                batch, batch_bytes = [], 0
+            continue
+
+        tasks.send(sentence.encode('utf-8'))
+        print(f"Gesendet ({i+1}/{count}): {sentence}")
         
         # Kleine Pause, damit es nicht zu schnell durchläuft (Simulation von Rechenzeit)
         time.sleep(0.05)
+    if batch:
+        tasks.send("\n".join(batch).encode('utf-8'))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,41 @@
+"""
+Unit-Tests für den konsistenten Hash-Ring.
+"""
+
+import unittest
+
+import hashring
+from hashring import HashRing
+
+
+class TestHashRing(unittest.TestCase):
+    """Testfälle für HashRing."""
+    nodes = [f"tcp://localhost:{5560 + i}" for i in range(4)]
+    keys = [f"wort{i}" for i in range(5000)] + ['', 'über', 'ß' * 40]
+
+    def test_node_index(self):
+        """Jeder Schlüssel gehört zu einem Knoten, die Zuordnung ist stabil (auch aus dem Cache)."""
+        ring = HashRing(self.nodes)
+        first = [ring.node_index(key) for key in self.keys]
+        self.assertEqual(first, [HashRing(self.nodes).node_index(key) for key in self.keys])
+        self.assertEqual(first, [ring.node_index(key) for key in self.keys])
+        self.assertEqual(set(first), set(range(len(self.nodes))))
+        self.assertEqual(ring.node(self.keys[0]), self.nodes[first[0]])
+
+    @unittest.skipIf(hashring.np is None, "NumPy nicht installiert")
+    def test_node_indices_match_scalar(self):
+        """Die vektorisierte Suche liefert dieselben Knoten wie node_index()."""
+        ring = HashRing(self.nodes)
+        self.assertEqual(ring.node_indices(self.keys).tolist(), [ring.node_index(key) for key in self.keys])
+
+    def test_add_node_moves_few_keys(self):
+        """Ein zusätzlicher Knoten übernimmt nur einen Teil der Schlüssel, die übrigen bleiben."""
+        before = HashRing(self.nodes)
+        after = HashRing(self.nodes + ["tcp://localhost:5564"])
+        moved = [key for key in self.keys if before.node(key) != after.node(key)]
+        self.assertTrue(all(after.node(key) == "tcp://localhost:5564" for key in moved))
+        self.assertLess(len(moved), len(self.keys) / 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Unit-Tests für die SpillTable (sortierte Runs auf der Platte, k-Wege-Mischen).
+"""
+
+import collections
+import random
+import unittest
+from unittest import mock
+
+import spill
+from spill import SpillTable
+
+
+def merge(target, batch):
+    for key, count in batch.items():
+        target[key] = target.get(key, 0) + count
+
+
+def combine(key, partials):
+    return sum(partials)
+
+
+class TestSpillTable(unittest.TestCase):
+    """Testfälle für SpillTable."""
+
+    def setUp(self):
+        rng = random.Random(4711)
+        self.batches = [{f"wort{rng.randrange(500)}": rng.randint(1, 5) for _ in range(40)} for _ in range(60)]
+        self.expected = collections.Counter()
+        for batch in self.batches:
+            self.expected.update(batch)
+
+    def fill(self, max_keys):
+        table = SpillTable(merge, combine, max_keys)
+        self.addCleanup(table.close)
+        for batch in self.batches:
+            table.update(dict(batch))
+        return table
+
+    def test_in_memory(self):
+        """Ohne Speichergrenze: kein Run, items() sortiert und vollständig."""
+        table = self.fill(None)
+        self.assertEqual(table.runs, [])
+        self.assertEqual(list(table.items()), sorted(self.expected.items()))
+
+    def test_merge_many_runs(self):
+        """Viele Runs (mehr als MERGE_FANIN): Teilwerte gleicher Schlüssel werden zusammengefasst."""
+        with mock.patch.object(spill, 'MERGE_FANIN', 4):
+            table = self.fill(50)
+            self.assertGreater(len(table.runs), 4)
+            items = list(table.items())
+        self.assertEqual(items, sorted(self.expected.items()))
+        self.assertLessEqual(len(table.runs), 5)  # vorab zusammengefasst
+
+    def test_get_across_runs(self):
+        """get() findet Schlüssel über den dünnen Index aller Runs und den Speicher."""
+        with mock.patch.object(spill, 'INDEX_EVERY', 8):
+            table = self.fill(50)
+            for key, count in self.expected.items():
+                self.assertEqual(table.get(key), count)
+            self.assertIsNone(table.get('fehlt'))
+            self.assertIsNone(table.get(''))
+
+
+if __name__ == '__main__':
+    unittest.main()
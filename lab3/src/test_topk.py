@@ -0,0 +1,53 @@
+"""
+Unit-Tests für TopK (inkrementell gepflegte Top-Schlüssel).
+"""
+
+import collections
+import random
+import unittest
+
+from topk import TopK
+
+
+class TestTopK(unittest.TestCase):
+    """Testfälle für TopK."""
+
+    def test_against_full_sort(self):
+        """Wachsende Werte in zufälliger Reihenfolge: dieselben Top-Werte wie beim Sortieren aller Schlüssel."""
+        rng = random.Random(4711)
+        counts = collections.Counter()
+        top = TopK(20)
+        for _ in range(20000):
+            key = f"wort{int(rng.paretovariate(1.2)) % 2000}"
+            counts[key] += 1
+            top.offer(key, counts[key])
+        for k in (1, 5, 20):
+            expected = sorted(counts.values(), reverse=True)[:k]
+            result = top.top(k)
+            self.assertEqual([value for _, value in result], expected)
+            for key, value in result:
+                self.assertEqual(counts[key], value)
+
+    def test_not_full(self):
+        """Weniger Schlüssel als Plätze: alle bleiben, keine Schwelle."""
+        top = TopK(5)
+        top.offer('a', 1)
+        top.offer('b', 3)
+        self.assertIsNone(top.threshold())
+        self.assertEqual(top.top(5), [('b', 3), ('a', 1)])
+
+    def test_threshold(self):
+        """Werte bis zur Schwelle werden nicht aufgenommen, größere verdrängen das Minimum."""
+        top = TopK(2)
+        top.offer('a', 2)
+        top.offer('b', 5)
+        top.offer('c', 2)
+        self.assertNotIn('c', top)
+        top.offer('c', 3)
+        self.assertIn('c', top)
+        self.assertNotIn('a', top)
+        self.assertEqual(top.threshold(), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
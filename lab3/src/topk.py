@@ -0,0 +1,50 @@
+import heapq
+import operator
+
+
+class TopK:
+    """
+    Die size Schlüssel mit den höchsten Werten, inkrementell gepflegt.
+    Werte dürfen nur wachsen (wie Wortanzahlen): dann bleibt ein Schlüssel, der einmal
+    unter der Schwelle (kleinster Wert im Kreis) lag, dort, bis ein neuer Wert ihn darüber hebt.
+    Der Min-Heap enthält auch veraltete Einträge, die beim Entfernen übersprungen werden.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.values = {}  # Schlüssel -> Wert der verfolgten Schlüssel
+        self.heap = []  # (Wert, Schlüssel), Minimum oben
+
+    def __contains__(self, key):
+        return key in self.values
+
+    def threshold(self):
+        """Kleinster Wert, der noch zu den Top-Schlüsseln gehört (None: noch nicht voll)."""
+        if len(self.values) < self.size:
+            return None
+        self._drop_stale()
+        return self.heap[0][0]
+
+    def offer(self, key, value):
+        """Neuer Wert eines Schlüssels; nimmt ihn auf, wenn er zu den Top-Schlüsseln gehört."""
+        if key not in self.values:
+            threshold = self.threshold()
+            if threshold is not None and value <= threshold:
+                return
+        self.values[key] = value
+        heapq.heappush(self.heap, (value, key))
+        if len(self.values) > self.size:
+            self._drop_stale()
+            _, evicted = heapq.heappop(self.heap)
+            del self.values[evicted]
+        if len(self.heap) > 4 * self.size:  # veraltete Einträge aufräumen
+            self.heap = [(value, key) for key, value in self.values.items()]
+            heapq.heapify(self.heap)
+
+    def top(self, k):
+        """Die k höchsten (Schlüssel, Wert)-Paare, absteigend (k <= size)."""
+        return heapq.nlargest(k, self.values.items(), key=operator.itemgetter(1))
+
+    def _drop_stale(self):
+        while self.heap and self.values.get(self.heap[0][1]) != self.heap[0][0]:
+            heapq.heappop(self.heap)